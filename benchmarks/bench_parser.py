@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Offline parser benchmark for the RTanks Discord Bot.
+Runs the profile/rankings parsers, rank emoji lookup and embed builder over the
+fixture corpus in benchmarks/fixtures/ and reports throughput, latency percentiles
+and peak traced memory per function and fixture.
+
+    python benchmarks/bench_parser.py                      # run and print a table
+    python benchmarks/bench_parser.py -o results.json      # also save results
+    python benchmarks/bench_parser.py --compare old.json   # show change against an earlier run
+    python benchmarks/bench_parser.py --update-expected    # accept current parser outputs
+    python benchmarks/bench_parser.py --backend bs4        # use the BeautifulSoup extraction backend
+
+Every run also checks that parsed outputs match benchmarks/expected.json and exits
+with status 1 if they don't, so a faster parser can't silently change results.
+Running with each --backend checks that the extraction backends agree.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import scraper
+from html_backend import BACKENDS
+from embed_cache import snapshot_fingerprint
+from scraper import parse_player_html, parse_rankings_html, build_rankings_index, find_player_in_rankings, parse_table_row
+from utils import get_rank_emoji
+from bot import RTanksBot
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+EXPECTED_PATH = os.path.join(BENCH_DIR, 'expected.json')
+
+RANK_NAMES = [
+    'Recruit', 'Private', 'Gefreiter', 'Corporal', 'Master Corporal', 'Sergeant', 'Staff Sergeant',
+    'Master Sergeant', 'First Sergeant', 'Sergeant Major', 'Warrant Officer 1', 'Warrant Officer 2',
+    'Warrant Officer 3', 'Warrant Officer 4', 'Warrant Officer 5', 'Third Lieutenant', 'Second Lieutenant',
+    'First Lieutenant', 'Captain', 'Major', 'Lieutenant Colonel', 'Colonel', 'Brigadier', 'Major General',
+    'Lieutenant General', 'General', 'Marshal', 'Field Marshal', 'Commander', 'Generalissimo',
+    'Legend', 'Legend 7', 'Legend Premium', 'Unknown',
+]
+
+
+def load_fixtures():
+    """Return ({name: html} for profile pages, {name: html} for rankings pages)."""
+    profiles, rankings = {}, {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        (rankings if name.startswith('rankings') else profiles)[name] = html
+    return profiles, rankings
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, iterations, warmup=3, size=None):
+    """Time fn() per call, then measure its peak traced allocation in a separate pass."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    total = sum(timings)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        'iterations': iterations,
+        'ops_per_s': round(iterations / total, 1) if total else None,
+        'mean_ms': round(total / iterations * 1000, 4),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 4),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 4),
+        'max_ms': round(timings[-1] * 1000, 4),
+        'peak_kb': round(peak / 1024, 1),
+    }
+    if size:
+        result['mb_per_s'] = round(size * iterations / total / 1024 / 1024, 2) if total else None
+    return result
+
+
+def embed_payload(embed):
+    """Embed as a dict without the timestamp, which differs on every build."""
+    payload = embed.to_dict()
+    payload.pop('timestamp', None)
+    return payload
+
+
+def run(iterations):
+    profiles, rankings = load_fixtures()
+    if not profiles and not rankings:
+        raise SystemExit(f"No fixtures in {FIXTURES_DIR}; run benchmarks/make_fixtures.py first")
+
+    bot = RTanksBot()
+    loop = asyncio.new_event_loop()
+    results = {}
+    outputs = {}
+
+    def record(function, fixture, result):
+        results.setdefault(function, {})[fixture] = result
+
+    try:
+        for name, html in profiles.items():
+            size = len(html.encode('utf-8'))
+            record('parse_player_html', name, measure(lambda: parse_player_html(html, name), iterations, size=size))
+            player_data = parse_player_html(html, name)
+            outputs[f'parse_player_html/{name}'] = player_data
+
+            # Building from scratch; _create_player_embed would be a cache hit after the first call
+            build = lambda: bot._build_player_embed(player_data)
+            record('build_player_embed', name, measure(build, iterations))
+            outputs[f'create_player_embed/{name}'] = embed_payload(build())
+
+            # What _create_player_embed does on a cache hit, without the event loop round trip
+            loop.run_until_complete(bot._create_player_embed(player_data))
+            cached = lambda: bot.embed_cache.get(snapshot_fingerprint(player_data))
+            record('embed_cache_hit', name, measure(cached, iterations))
+            if embed_payload(cached()) != outputs[f'create_player_embed/{name}']:
+                raise SystemExit(f"Cached embed for {name} differs from a freshly built one")
+
+        for name, html in rankings.items():
+            size = len(html.encode('utf-8'))
+            record('parse_rankings_html', name, measure(lambda: parse_rankings_html(html), iterations, size=size))
+            rows = parse_rankings_html(html)
+            record('build_rankings_index', name, measure(lambda: build_rankings_index(rows), iterations))
+            outputs[f'build_rankings_index/{name}'] = build_rankings_index(rows)
+
+            # Worst case for the on-demand search: the last player row
+            last = next((row['user'] for row in reversed(rows) if row['user']), 'nobody')
+            record('find_player_in_rankings', name, measure(lambda: find_player_in_rankings(rows, last), iterations))
+            outputs[f'find_player_in_rankings/{name}'] = find_player_in_rankings(rows, last)
+
+            player_rows = [row['cells'] for row in rows if row['user']]
+            record('parse_table_row', name, measure(
+                lambda: [parse_table_row(cells, 'x') for cells in player_rows], iterations
+            ))
+
+        record('get_rank_emoji', 'all_ranks', measure(
+            lambda: [get_rank_emoji(rank) for rank in RANK_NAMES], iterations
+        ))
+        outputs['get_rank_emoji/all_ranks'] = {rank: get_rank_emoji(rank) for rank in RANK_NAMES}
+    finally:
+        bot.scraper.parse_pool.shutdown()
+        loop.close()
+
+    # Round-trip through JSON so outputs compare the same way as the stored copy
+    return results, json.loads(json.dumps(outputs, ensure_ascii=False, sort_keys=True))
+
+
+def check_outputs(outputs, update=False):
+    """Compare outputs with the expected file; return the list of mismatching keys."""
+    if update or not os.path.exists(EXPECTED_PATH):
+        with open(EXPECTED_PATH, 'w', encoding='utf-8') as f:
+            json.dump(outputs, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"Wrote expected outputs to {EXPECTED_PATH}")
+        return []
+    with open(EXPECTED_PATH, encoding='utf-8') as f:
+        expected = json.load(f)
+    keys = sorted(set(expected) | set(outputs))
+    return [key for key in keys if expected.get(key) != outputs.get(key)]
+
+
+def print_table(results, previous=None):
+    header = f"{'function':<26}{'fixture':<22}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KB':>10}"
+    if previous:
+        header += f"{'vs prev':>10}"
+    print(header)
+    print('-' * len(header))
+    for function, fixtures in results.items():
+        for fixture, r in fixtures.items():
+            line = (f"{function:<26}{fixture:<22}{r['ops_per_s']:>10}{r['p50_ms']:>10}"
+                    f"{r['p95_ms']:>10}{r['p99_ms']:>10}{r['peak_kb']:>10}")
+            if previous:
+                before = previous.get(function, {}).get(fixture)
+                if before and before.get('p50_ms'):
+                    change = (r['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+                    line += f"{change:>+9.1f}%"
+                else:
+                    line += f"{'new':>10}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--iterations', type=int, default=200, help='timed calls per function and fixture')
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier results JSON to compare p50 latency against')
+    parser.add_argument('--update-expected', action='store_true', help='store current outputs as expected')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), help='HTML extraction backend (default: config)')
+    args = parser.parse_args()
+
+    if args.backend:
+        scraper.HTML_BACKEND = BACKENDS[args.backend]
+
+    # Measure the parsers, not log formatting
+    logging.disable(logging.INFO)
+
+    results, outputs = run(args.iterations)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)['results']
+    print_table(results, previous)
+
+    mismatches = check_outputs(outputs, update=args.update_expected)
+
+    if args.output:
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'backend': scraper.HTML_BACKEND.name,
+            'outputs_match': not mismatches,
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if mismatches:
+        print(f"\nParsed outputs differ from {os.path.basename(EXPECTED_PATH)}:")
+        for key in mismatches:
+            print(f"  {key}")
+        sys.exit(1)
+    print("\nParsed outputs match expected.json")
+
+
+if __name__ == '__main__':
+    main()
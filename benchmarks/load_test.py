@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+End-to-end load harness for the RTanks Discord Bot.
+Starts a local aiohttp stand-in for the ratings website (serving the fixture corpus
+with configurable latency, error rate and page sizes), points the bot's scraper at it
+and drives player_command_handler with fake interactions at a target rate.
+No Discord connection or network access is needed.
+
+    python benchmarks/load_test.py --rate 50 --duration 30
+    python benchmarks/load_test.py --rate 200 --players 5000 --latency 0.3 --error-rate 0.05 -o load.json
+
+Reports command throughput, latency percentiles (defer to final followup),
+outcomes, event loop lag and RSS growth.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import zlib
+
+import psutil
+from aiohttp import web
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench_parser import load_fixtures, percentile
+from bot import RTanksBot
+from ratelimit import TokenBucket
+
+
+class StandInServer:
+    """Local imitation of the ratings website backed by the fixture corpus."""
+
+    def __init__(self, profiles, rankings, latency=0.05, jitter=0.5, error_rate=0.0,
+                 missing_rate=0.0, page_size='mixed', seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.missing_rate = missing_rate
+        self.random = random.Random(seed)
+        self.rankings = next(iter(rankings.values()), '<html></html>')
+
+        # Page size classes: small = the smallest fixtures, large = the heaviest
+        pages = sorted(profiles.values(), key=len)
+        if page_size == 'small':
+            pages = pages[:max(1, len(pages) // 3)]
+        elif page_size == 'large':
+            pages = pages[-max(1, len(pages) // 3):]
+        self.pages = pages
+
+        self.requests = 0
+        self.errors = 0
+        self._runner = None
+        self.url = None
+
+    async def _delay(self):
+        if self.latency:
+            spread = self.latency * self.jitter
+            await asyncio.sleep(max(0.0, self.random.uniform(self.latency - spread, self.latency + spread)))
+
+    async def _maybe_fail(self):
+        self.requests += 1
+        await self._delay()
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503, text='Service Unavailable')
+        return None
+
+    async def profile(self, request):
+        failure = await self._maybe_fail()
+        if failure is not None:
+            return failure
+        name = request.match_info['name']
+        if name.startswith('missing') or self.random.random() < self.missing_rate:
+            return web.Response(status=404, text='Not Found')
+        # The same player always gets the same page
+        html = self.pages[zlib.crc32(name.encode('utf-8')) % len(self.pages)]
+        return web.Response(text=html, content_type='text/html', charset='utf-8')
+
+    async def index(self, request):
+        failure = await self._maybe_fail()
+        if failure is not None:
+            return failure
+        return web.Response(text=self.rankings, content_type='text/html', charset='utf-8')
+
+    async def start(self, host='127.0.0.1', port=0):
+        app = web.Application()
+        app.router.add_get('/user/{name}', self.profile)
+        app.router.add_get('/', self.index)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f'http://{host}:{port}'
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class _FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def defer(self, *args, **kwargs):
+        self.interaction.deferred_at = time.perf_counter()
+
+
+class _FakeFollowup:
+    def __init__(self, interaction, latency):
+        self.interaction = interaction
+        self.latency = latency
+
+    async def send(self, *args, embed=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.interaction.sent_at = time.perf_counter()
+        self.interaction.embed = embed
+
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for the slash command handlers."""
+
+    def __init__(self, send_latency=0.0):
+        self.created_at = time.perf_counter()
+        self.deferred_at = None
+        self.sent_at = None
+        self.embed = None
+        self.response = _FakeResponse(self)
+        self.followup = _FakeFollowup(self, send_latency)
+
+    @property
+    def outcome(self):
+        if self.embed is None:
+            return 'no_reply'
+        title = self.embed.title or ''
+        if title.startswith('❌'):
+            return 'not_found'
+        if title.startswith('⚠️'):
+            return 'error'
+        return 'ok'
+
+
+async def watch_loop_lag(lags, tick=0.05):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(tick)
+        lags.append(time.perf_counter() - start - tick)
+
+
+async def run(args):
+    profiles, rankings = load_fixtures()
+    server = StandInServer(
+        profiles, rankings,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        missing_rate=args.missing_rate, page_size=args.page_size, seed=args.seed
+    )
+    base_url = await server.start()
+
+    bot = RTanksBot()
+    scraper = bot.scraper
+    scraper.base_url = base_url
+    # Keep runs independent of each other and of a real bot's snapshot database and history
+    scraper.store = None
+    scraper.history = None
+    if args.upstream_rate:
+        scraper.rate_limiter = TokenBucket(args.upstream_rate, max(1, int(args.upstream_rate)))
+    else:
+        scraper.rate_limiter = TokenBucket(1e9, 10 ** 9)
+    scraper.http.limiter = scraper.rate_limiter
+
+    process = psutil.Process(os.getpid())
+    rss_start = process.memory_info().rss
+    lags = []
+    lag_task = asyncio.create_task(watch_loop_lag(lags))
+    players = [f'Player{i}' for i in range(args.players)]
+    rng = random.Random(args.seed)
+
+    interactions = []
+    tasks = []
+    started = time.perf_counter()
+    interval = 1.0 / args.rate
+    total = int(args.rate * args.duration)
+    print(f"Stand-in server at {base_url}; sending {total} /player commands at {args.rate}/s")
+    for i in range(total):
+        # Open loop: schedule by the clock so a slow bot doesn't lower the offered load
+        delay = started + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        interaction = FakeInteraction(args.send_latency)
+        interactions.append(interaction)
+        tasks.append(asyncio.create_task(
+            bot.player_command_handler(interaction, rng.choice(players), fresh=args.fresh)
+        ))
+    offered_elapsed = time.perf_counter() - started
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    rss_end = process.memory_info().rss
+    lag_task.cancel()
+    await scraper.close()
+    await server.stop()
+
+    latencies = sorted(i.sent_at - i.created_at for i in interactions if i.sent_at is not None)
+    outcomes = {}
+    for interaction in interactions:
+        outcomes[interaction.outcome] = outcomes.get(interaction.outcome, 0) + 1
+    lags.sort()
+    cache = scraper.cache.stats()
+    return {
+        'config': vars(args),
+        'commands': total,
+        'offered_rate': round(total / offered_elapsed, 1) if offered_elapsed else None,
+        'throughput': round(len(latencies) / elapsed, 1),
+        'elapsed_s': round(elapsed, 2),
+        'outcomes': outcomes,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        'loop_lag_ms': {
+            'p50': round(percentile(lags, 0.50) * 1000, 2),
+            'p99': round(percentile(lags, 0.99) * 1000, 2),
+            'max': round(lags[-1] * 1000, 2) if lags else 0.0,
+        },
+        'rss_mb': {
+            'start': round(rss_start / 1024 / 1024, 1),
+            'end': round(rss_end / 1024 / 1024, 1),
+            'growth': round((rss_end - rss_start) / 1024 / 1024, 1),
+        },
+        'upstream': {
+            'requests': server.requests,
+            'errors': server.errors,
+            'statuses': dict(scraper.status_counts),
+            'breaker': scraper.breaker.stats()['state'],
+        },
+        'cache_hit_rate': cache['hit_rate'],
+        'parse_pool': scraper.parse_pool.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rate', type=float, default=20, help='/player commands per second')
+    parser.add_argument('--duration', type=float, default=10, help='seconds to keep sending commands')
+    parser.add_argument('--players', type=int, default=500, help='distinct usernames to pick from')
+    parser.add_argument('--fresh', action='store_true', help='bypass the snapshot cache')
+    parser.add_argument('--latency', type=float, default=0.05, help='stand-in server response latency (s)')
+    parser.add_argument('--jitter', type=float, default=0.5, help='latency spread as a fraction of --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of 503 responses')
+    parser.add_argument('--missing-rate', type=float, default=0.0, help='fraction of 404 profile responses')
+    parser.add_argument('--page-size', choices=['small', 'mixed', 'large'], default='mixed')
+    parser.add_argument('--send-latency', type=float, default=0.0, help='simulated Discord followup latency (s)')
+    parser.add_argument('--upstream-rate', type=float, default=0,
+                        help='requests/s allowed to the stand-in server (0 = unlimited)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='write the report as JSON to this file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    report = asyncio.run(run(args))
+    print(json.dumps({k: v for k, v in report.items() if k != 'config'}, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
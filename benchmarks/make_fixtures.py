@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Generate the benchmark fixture corpus in benchmarks/fixtures/.
+Pages mimic the RTanks ratings website layout (hidden online status span, labelled
+stat blocks, equipment cards, rankings tables). Output is deterministic, so the
+committed fixtures can be regenerated byte for byte; real saved pages can be
+dropped into the directory alongside them (profile_*.html / rankings*.html).
+"""
+
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TURRETS = {
+    'en': ['Smoky', 'Rail', 'Ricochet', 'Isida', 'Freeze', 'Thunder', 'Hammer', 'Vulcan', 'Twins', 'Shaft', 'Striker'],
+    'ru': ['Смоки', 'Рельса', 'Рикошет', 'Изида', 'Фриз', 'Гром', 'Молот', 'Вулкан', 'Твинс', 'Шафт', 'Страйкер'],
+}
+HULLS = {
+    'en': ['Hunter', 'Mammoth', 'Titan', 'Wasp', 'Viking', 'Hornet', 'Dictator'],
+    'ru': ['Хантер', 'Мамонт', 'Титан', 'Васп', 'Викинг', 'Хорнет', 'Диктатор'],
+}
+LABELS = {
+    'en': {
+        'experience': 'Experience', 'kills': 'Destroyed', 'deaths': 'Hit', 'kd': 'U/P',
+        'premium': 'Premium', 'group': 'Group', 'gold': 'Caught gold boxes',
+        'installed': 'Installed', 'yes': 'Yes', 'no': 'No', 'groups': ['Player', 'Helper'],
+    },
+    'ru': {
+        'experience': 'Опыт', 'kills': 'Уничтожил', 'deaths': 'Подбит', 'kd': 'У/П',
+        'premium': 'Премиум', 'group': 'Группа', 'gold': 'Поймано золотых ящиков',
+        'installed': 'Установленный', 'yes': 'Да', 'no': 'Нет', 'groups': ['Игрок', 'Помощник'],
+    },
+}
+
+# name: (seed, locale, experience, equipment cards, filler blocks)
+PROFILES = {
+    'profile_en_recruit': (1, 'en', 50, 4, 20),
+    'profile_en_mid': (2, 'en', 105613, 20, 60),
+    'profile_en_heavy': (3, 'en', 692500, 180, 120),
+    'profile_en_legend': (4, 'en', 2345678, 40, 60),
+    'profile_ru_mid': (5, 'ru', 41500, 20, 60),
+    'profile_ru_heavy': (6, 'ru', 1255000, 180, 120),
+    'profile_ru_legend': (7, 'ru', 4100000, 40, 60),
+}
+
+RANKINGS = {
+    # name: (seed, tables, rows per table)
+    'rankings': (10, 4, 100),
+}
+
+
+def _number(value, separator):
+    return f"{value:,}".replace(',', separator)
+
+
+def profile_page(seed, locale, experience, equipment, filler):
+    r = random.Random(seed)
+    labels = LABELS[locale]
+    separator = r.choice([',', ' '])
+    parts = [
+        f'<!DOCTYPE html><html lang="{locale}"><head><meta charset="utf-8"><title>RTanks Online</title>'
+        '<style>.stat{margin:2px}.equipment-card{margin:4px}</style></head><body>',
+        f'<div class="header"><h1>Player</h1>'
+        f'<span id="online_status" style="display:none">{r.choice(["yes", "no"])}</span></div>',
+    ]
+    for i in range(filler):
+        parts.append(f'<div class="row"><p>Lorem ipsum {i} dolor sit amet {r.randint(0, 999)}</p></div>')
+    parts.append(f'<div class="stat">{labels["experience"]} {experience} / {experience + 1000}</div>')
+    parts.append(f'<div class="stat">{labels["kills"]} {_number(r.randint(0, 300000), separator)}</div>')
+    parts.append(f'<div class="stat">{labels["deaths"]} {_number(r.randint(0, 300000), separator)}</div>')
+    parts.append(f'<div class="stat">{labels["kd"]} {r.random() * 3:.2f}</div>')
+    if r.random() < 0.5:
+        parts.append(f'<div class="stat">{labels["premium"]} {labels["yes"]}</div>')
+    parts.append(f'<div class="stat">{labels["group"]} {r.choice(labels["groups"])}</div>')
+    parts.append(f'<div class="stat">{labels["gold"]} {_number(r.randint(0, 5000), separator)}</div>')
+    names = TURRETS[locale] + HULLS[locale]
+    for _ in range(equipment):
+        installed = labels['yes'] if r.random() < 0.3 else labels['no']
+        parts.append(
+            f'<div class="equipment-card"><h3>{r.choice(names)} M{r.randint(0, 3)}</h3>'
+            f'<p>{labels["installed"]}: {installed}</p></div>'
+        )
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def rankings_page(seed, tables, rows):
+    r = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>RTanks Ratings</title></head><body>']
+    for table in range(tables):
+        parts.append(f'<h2>Top {table + 1}</h2><table class="rating">')
+        parts.append('<tr><th>#</th><th>Player</th><th>Value</th></tr>')
+        value = r.randint(5_000_000, 9_000_000)
+        for place in range(1, rows + 1):
+            name = f'Player_{table}_{place}_{r.randint(100, 999)}'
+            value -= r.randint(100, 20000)
+            parts.append(
+                f'<tr><td>{place}</td><td><a href="/user/{name}">{name}</a></td>'
+                f'<td>{_number(value, ",")}</td></tr>'
+            )
+        parts.append('</table>')
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    pages = {name: profile_page(*args) for name, args in PROFILES.items()}
+    pages.update({name: rankings_page(*args) for name, args in RANKINGS.items()})
+    for name, html in pages.items():
+        path = os.path.join(FIXTURES_DIR, f'{name}.html')
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(html)
+        print(f"{path}: {len(html.encode('utf-8'))} bytes")
+
+
+if __name__ == '__main__':
+    main()
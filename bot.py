@@ -8,27 +8,52 @@ from discord.ext import commands
 import aiohttp
 import asyncio
 import time
-import psutil
-import os
 from datetime import datetime, timedelta
 import logging
+import math
+import os
+import re
 
 from scraper import RTanksScraper
-from utils import format_number, format_exact_number, get_rank_emoji, format_duration
-from config import RANK_EMOJIS, PREMIUM_EMOJI, GOLD_BOX_EMOJI, RTANKS_BASE_URL
+from sampler import StatsSampler
+from metrics import STAGE_SECONDS, COMMAND_SECONDS, COMMANDS
+from tracing import trace, span
+from utils import format_number, format_exact_number, format_duration
+from ranks import rank_emoji, rank_emoji_url
+from embed_cache import EmbedCache, snapshot_fingerprint
+from history import PERIODS
+from watchlist import Watchlist
+from shards import ShardStatsTable, guild_shard, format_shard_ids, process_path
+from config import (
+    RANK_EMOJIS, PREMIUM_EMOJI, GOLD_BOX_EMOJI, RTANKS_BASE_URL,
+    COMPARE_MIN_PLAYERS, COMPARE_MAX_PLAYERS,
+    STATS_SAMPLE_INTERVAL, STATS_SAMPLE_HISTORY, STATS_PROBE_TIMEOUT, EMBED_CACHE_MAX_ENTRIES,
+    WATCHLIST_PATH, WATCHLIST_REQUESTS_PER_MINUTE, WATCHLIST_ONLINE_INTERVAL, WATCHLIST_NEAR_RANK_INTERVAL,
+    WATCHLIST_IDLE_INTERVAL, WATCHLIST_NEAR_RANK_FRACTION, WATCHLIST_MAX_BACKOFF, WATCHLIST_MAX_PER_GUILD,
+    HISTORY_PATH, SHARD_STATS_PATH, SHARD_STATS_INTERVAL
+)
 
 logger = logging.getLogger(__name__)
 
-class RTanksBot(commands.Bot):
-    def __init__(self):
+class RTanksBot(commands.AutoShardedBot):
+    def __init__(self, shard_ids=None, shard_count=None, process_index=None, process_count=1):
+        """
+        Without arguments every shard Discord recommends runs in this process. A worker
+        process started by main.py's supervisor gets its shard_ids out of shard_count and
+        its process_index, which names its own files and its row in the shard stats table;
+        the website request budgets are split evenly across the process_count workers.
+        """
         intents = discord.Intents.default()
         intents.message_content = True
         
         super().__init__(
             command_prefix='!',
             intents=intents,
-            help_command=None
+            help_command=None,
+            shard_ids=shard_ids,
+            shard_count=shard_count
         )
+        self.process_index = process_index
         
         # Bot statistics
         self.start_time = datetime.now()
@@ -37,15 +62,67 @@ class RTanksBot(commands.Bot):
         self.scraping_failures = 0
         self.total_scraping_time = 0.0
         
-        # Initialize scraper
-        self.scraper = RTanksScraper()
+        # Initialize scraper (the snapshot store is shared by every process; history is per process)
+        self.scraper = RTanksScraper(
+            history_path=process_path(HISTORY_PATH, process_index), processes=process_count
+        )
+        
+        # Rendered player embeds, keyed by snapshot fingerprint
+        self.embed_cache = EmbedCache(EMBED_CACHE_MAX_ENTRIES)
+        
+        # Players guilds asked to be notified about
+        self.watchlist = Watchlist(
+            self.scraper,
+            self._send_watch_notification,
+            path=WATCHLIST_PATH,
+            requests_per_minute=WATCHLIST_REQUESTS_PER_MINUTE / process_count,
+            online_interval=WATCHLIST_ONLINE_INTERVAL,
+            near_rank_interval=WATCHLIST_NEAR_RANK_INTERVAL,
+            idle_interval=WATCHLIST_IDLE_INTERVAL,
+            near_rank_fraction=WATCHLIST_NEAR_RANK_FRACTION,
+            max_backoff=WATCHLIST_MAX_BACKOFF,
+            max_per_guild=WATCHLIST_MAX_PER_GUILD,
+            guild_filter=self._serves_guild if shard_ids is not None else None
+        )
+        
+        # Worker processes publish their statistics for each other's /botstats
+        self.shard_stats = None
+        if process_index is not None:
+            self.shard_stats = ShardStatsTable(
+                SHARD_STATS_PATH, process_index, self._shard_stats_row, SHARD_STATS_INTERVAL
+            )
+        
+        # Health samples rendered by /botstats
+        self.sampler = StatsSampler(
+            probe=self._probe_website,
+            interval=STATS_SAMPLE_INTERVAL,
+            history=STATS_SAMPLE_HISTORY,
+            probe_timeout=STATS_PROBE_TIMEOUT,
+            before_probe=self._wait_for_probe_slot
+        )
     
     async def setup_hook(self):
         """Setup hook called when bot is starting up."""
         # Register commands with the command tree
         self.tree.command(name="player", description="Get RTanks player statistics")(self.player_command_handler)
+        self.tree.command(name="compare", description="Compare several RTanks players side by side")(self.compare_command_handler)
+        self.tree.command(name="history", description="Show an RTanks player's progress over time")(self.history_command_handler)
+        self.tree.command(name="watch", description="Get notified when an RTanks player ranks up or comes online")(self.watch_command_handler)
+        self.tree.command(name="unwatch", description="Stop watching an RTanks player")(self.unwatch_command_handler)
+        self.tree.command(name="watchlist", description="Show the players this server is watching")(self.watchlist_command_handler)
         self.tree.command(name="botstats", description="Display bot performance statistics")(self.botstats_command_handler)
         
+        # Open connections to the website in the background and keep the rankings index warm
+        self.warm_up_task = asyncio.create_task(self.scraper.warm_up())
+        self.scraper.rankings_index.start()
+        self.sampler.start()
+        self.watchlist.start()
+        if self.shard_stats:
+            self.shard_stats.start()
+        
+        # Commands are global: one worker process syncing them is enough
+        if self.process_index:
+            return
         try:
             synced = await self.tree.sync()
             logger.info(f"Synced {len(synced)} command(s)")
@@ -61,47 +138,262 @@ class RTanksBot(commands.Bot):
         activity = discord.Game(name="RTanks Online")
         await self.change_presence(activity=activity)
 
-    @discord.app_commands.describe(username="RTanks player username to lookup")
-    async def player_command_handler(self, interaction: discord.Interaction, username: str):
+    @discord.app_commands.describe(
+        username="RTanks player username to lookup",
+        fresh="Skip cached data and fetch the profile again"
+    )
+    async def player_command_handler(self, interaction: discord.Interaction, username: str, fresh: bool = False):
         """Slash command to get player statistics."""
+        with trace('player', username=username, fresh=fresh):
+            await interaction.response.defer()
+            
+            start_time = time.time()
+            self.commands_processed += 1
+            
+            try:
+                # Scrape player data
+                with span('lookup'):
+                    player_data = await self.scraper.get_player_data(username.strip(), fresh=fresh)
+                scraping_time = time.time() - start_time
+                
+                if not player_data:
+                    embed = discord.Embed(
+                        title="❌ Player Not Found",
+                        description=f"Could not find player data for `{username}`. Please check the username and try again.",
+                        color=0xff0000
+                    )
+                    with STAGE_SECONDS.time(stage='discord_send'), span('discord_send'):
+                        await interaction.followup.send(embed=embed)
+                    self.scraping_failures += 1
+                    COMMANDS.inc(command='player', outcome='not_found')
+                    return
+                
+                # Create player embed
+                with STAGE_SECONDS.time(stage='embed_build'), span('embed_build'):
+                    embed = await self._create_player_embed(player_data)
+                with STAGE_SECONDS.time(stage='discord_send'), span('discord_send'):
+                    await interaction.followup.send(embed=embed)
+                
+                # Update statistics (lookup time only, not the Discord round trip)
+                self.total_scraping_time += scraping_time
+                self.scraping_successes += 1
+                COMMANDS.inc(command='player', outcome='success')
+                
+            except Exception as e:
+                logger.error(f"Error processing player command: {e}")
+                
+                embed = discord.Embed(
+                    title="⚠️ Error",
+                    description="An error occurred while fetching player data. The RTanks website might be temporarily unavailable.",
+                    color=0xffa500
+                )
+                await interaction.followup.send(embed=embed)
+                self.scraping_failures += 1
+                COMMANDS.inc(command='player', outcome='error')
+            finally:
+                COMMAND_SECONDS.observe(time.time() - start_time, command='player')
+
+    @discord.app_commands.describe(
+        players=f"{COMPARE_MIN_PLAYERS}-{COMPARE_MAX_PLAYERS} usernames separated by spaces or commas",
+        fresh="Skip cached data and fetch the profiles again"
+    )
+    async def compare_command_handler(self, interaction: discord.Interaction, players: str, fresh: bool = False):
+        """Slash command to compare several players side by side."""
+        with trace('compare', players=players, fresh=fresh):
+            await interaction.response.defer()
+            
+            start_time = time.time()
+            self.commands_processed += 1
+            
+            # Deduplicate case-insensitively, keeping the order the players were given in
+            usernames = []
+            for name in re.split(r'[\s,]+', players):
+                if name and name.lower() not in [seen.lower() for seen in usernames]:
+                    usernames.append(name)
+            if not COMPARE_MIN_PLAYERS <= len(usernames) <= COMPARE_MAX_PLAYERS:
+                embed = discord.Embed(
+                    title="❌ Invalid Players",
+                    description=f"Please provide between {COMPARE_MIN_PLAYERS} and {COMPARE_MAX_PLAYERS} different usernames.",
+                    color=0xff0000
+                )
+                await interaction.followup.send(embed=embed)
+                return
+            
+            try:
+                results = {}
+                with span('bulk_lookup', players=len(usernames)):
+                    async for username, player_data in self.scraper.get_players_bulk(usernames, fresh=fresh):
+                        results[username.lower()] = player_data
+                
+                scraping_time = time.time() - start_time
+                found = [results[name.lower()] for name in usernames if results.get(name.lower())]
+                missing = [name for name in usernames if not results.get(name.lower())]
+                if not found:
+                    embed = discord.Embed(
+                        title="❌ Players Not Found",
+                        description="Could not find data for any of the given players. Please check the usernames and try again.",
+                        color=0xff0000
+                    )
+                    with STAGE_SECONDS.time(stage='discord_send'), span('discord_send'):
+                        await interaction.followup.send(embed=embed)
+                    self.scraping_failures += 1
+                    COMMANDS.inc(command='compare', outcome='not_found')
+                    return
+                
+                with STAGE_SECONDS.time(stage='embed_build'), span('embed_build'):
+                    embed = self._create_compare_embed(found, missing)
+                with STAGE_SECONDS.time(stage='discord_send'), span('discord_send'):
+                    await interaction.followup.send(embed=embed)
+                
+                # Update statistics (lookup time only, not the Discord round trip)
+                self.total_scraping_time += scraping_time
+                self.scraping_successes += 1
+                COMMANDS.inc(command='compare', outcome='success')
+                
+            except Exception as e:
+                logger.error(f"Error processing compare command: {e}")
+                
+                embed = discord.Embed(
+                    title="⚠️ Error",
+                    description="An error occurred while fetching player data. The RTanks website might be temporarily unavailable.",
+                    color=0xffa500
+                )
+                await interaction.followup.send(embed=embed)
+                self.scraping_failures += 1
+                COMMANDS.inc(command='compare', outcome='error')
+            finally:
+                COMMAND_SECONDS.observe(time.time() - start_time, command='compare')
+
+    @discord.app_commands.describe(
+        username="RTanks player username",
+        period="How far back to look (default: last 7 days)"
+    )
+    @discord.app_commands.choices(period=[
+        discord.app_commands.Choice(name="Last 24 hours", value="day"),
+        discord.app_commands.Choice(name="Last 7 days", value="week"),
+        discord.app_commands.Choice(name="Last 30 days", value="month"),
+        discord.app_commands.Choice(name="All recorded history", value="all"),
+    ])
+    async def history_command_handler(self, interaction: discord.Interaction, username: str, period: str = 'week'):
+        """Slash command to show a player's recorded progress; never fetches the website."""
         await interaction.response.defer()
-        
         start_time = time.time()
         self.commands_processed += 1
-        
         try:
-            # Scrape player data
-            player_data = await self.scraper.get_player_data(username.strip())
-            
+            summary = None
+            if self.scraper.history:
+                summary = self.scraper.history.summary(username.strip(), PERIODS.get(period, PERIODS['week']))
+            if summary is None:
+                embed = discord.Embed(
+                    title="❌ No History",
+                    description=f"No history recorded for `{username}` yet. Look the player up with /player to start tracking.",
+                    color=0xff0000
+                )
+                COMMANDS.inc(command='history', outcome='not_found')
+            else:
+                embed = self._create_history_embed(summary, period)
+                COMMANDS.inc(command='history', outcome='success')
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Error processing history command: {e}")
+            COMMANDS.inc(command='history', outcome='error')
+            embed = discord.Embed(
+                title="⚠️ Error",
+                description="An error occurred while reading the player's history.",
+                color=0xffa500
+            )
+            await interaction.followup.send(embed=embed)
+        finally:
+            COMMAND_SECONDS.observe(time.time() - start_time, command='history')
+
+    @discord.app_commands.describe(username="RTanks player username to watch")
+    @discord.app_commands.guild_only()
+    @discord.app_commands.default_permissions(manage_guild=True)
+    async def watch_command_handler(self, interaction: discord.Interaction, username: str):
+        """Slash command to add a player to this server's watchlist; notifications go to this channel."""
+        await interaction.response.defer()
+        self.commands_processed += 1
+        username = username.strip()
+        try:
+            player_data = await self.scraper.get_player_data(username)
             if not player_data:
                 embed = discord.Embed(
                     title="❌ Player Not Found",
                     description=f"Could not find player data for `{username}`. Please check the username and try again.",
                     color=0xff0000
                 )
-                await interaction.followup.send(embed=embed)
-                self.scraping_failures += 1
-                return
-            
-            # Create player embed
-            embed = await self._create_player_embed(player_data)
+                COMMANDS.inc(command='watch', outcome='not_found')
+            else:
+                result = await self.watchlist.add(
+                    interaction.guild_id, interaction.channel_id, player_data['username'], player_data
+                )
+                if result == 'full':
+                    embed = discord.Embed(
+                        title="❌ Watchlist Full",
+                        description=f"This server already watches {WATCHLIST_MAX_PER_GUILD} players. Use /unwatch to make room.",
+                        color=0xff0000
+                    )
+                else:
+                    already = "Already watching" if result == 'exists' else "Now watching"
+                    embed = discord.Embed(
+                        title=f"👁️ {already} {player_data['username']}",
+                        description=(
+                            f"Rank-ups and coming online will be posted in <#{interaction.channel_id}>.\n"
+                            f"Currently {rank_emoji(player_data['rank'])} **{player_data['rank']}**, "
+                            f"{'online' if player_data['is_online'] else 'offline'}."
+                        ),
+                        color=0x00ff00
+                    )
+                COMMANDS.inc(command='watch', outcome='success' if result != 'full' else 'rejected')
             await interaction.followup.send(embed=embed)
-            
-            # Update statistics
-            scraping_time = time.time() - start_time
-            self.total_scraping_time += scraping_time
-            self.scraping_successes += 1
-            
         except Exception as e:
-            logger.error(f"Error processing player command: {e}")
-            
+            logger.error(f"Error processing watch command: {e}")
+            COMMANDS.inc(command='watch', outcome='error')
             embed = discord.Embed(
                 title="⚠️ Error",
-                description="An error occurred while fetching player data. The RTanks website might be temporarily unavailable.",
+                description="An error occurred while adding the player. Please try again later.",
                 color=0xffa500
             )
             await interaction.followup.send(embed=embed)
-            self.scraping_failures += 1
+
+    @discord.app_commands.describe(username="RTanks player username to stop watching")
+    @discord.app_commands.guild_only()
+    @discord.app_commands.default_permissions(manage_guild=True)
+    async def unwatch_command_handler(self, interaction: discord.Interaction, username: str):
+        """Slash command to remove a player from this server's watchlist."""
+        self.commands_processed += 1
+        if await self.watchlist.remove(interaction.guild_id, username.strip()):
+            embed = discord.Embed(title=f"✅ Stopped watching {username.strip()}", color=0x00ff00)
+        else:
+            embed = discord.Embed(
+                title="❌ Not Watched",
+                description=f"`{username.strip()}` is not on this server's watchlist.",
+                color=0xff0000
+            )
+        await interaction.response.send_message(embed=embed)
+
+    @discord.app_commands.guild_only()
+    async def watchlist_command_handler(self, interaction: discord.Interaction):
+        """Slash command to list the players this server is watching."""
+        self.commands_processed += 1
+        entries = self.watchlist.watched(interaction.guild_id)
+        embed = discord.Embed(title="👁️ Watchlist", color=0x00ff00, timestamp=datetime.now())
+        if not entries:
+            embed.description = "This server isn't watching anyone yet. Use /watch to add a player."
+        else:
+            lines = []
+            for entry in entries:
+                if not entry.known:
+                    lines.append(f"⚪ **{entry.name}** — not checked yet")
+                    continue
+                status = "🟢" if entry.is_online else "🔴"
+                checked = format_duration(time.time() - entry.checked_at)
+                lines.append(f"{status} **{entry.name}** — {rank_emoji(entry.rank)} {entry.rank} (checked {checked} ago)")
+            embed.description = "\n".join(lines)
+            channel_id = self.watchlist.guilds[interaction.guild_id]['channel_id']
+            embed.set_footer(text=f"{len(entries)}/{WATCHLIST_MAX_PER_GUILD} players")
+            embed.add_field(name="Notifications", value=f"<#{channel_id}>", inline=False)
+        await interaction.response.send_message(embed=embed)
 
     async def botstats_command_handler(self, interaction: discord.Interaction):
         """Slash command to display bot statistics."""
@@ -121,10 +413,8 @@ class RTanksBot(commands.Bot):
         uptime = datetime.now() - self.start_time
         uptime_str = format_duration(uptime.total_seconds())
         
-        # Get system stats
-        process = psutil.Process(os.getpid())
-        memory_usage = round(process.memory_info().rss / 1024 / 1024, 2)  # MB
-        cpu_usage = round(process.cpu_percent(interval=1), 1)
+        # System and website health from the background sampler
+        health = self.sampler.stats()
         
         # Calculate success rate
         total_scrapes = self.scraping_successes + self.scraping_failures
@@ -157,6 +447,11 @@ class RTanksBot(commands.Bot):
             inline=True
         )
         
+        # Shards of this process, or of every worker process when supervised
+        shards_text = await self._format_shards()
+        if shards_text:
+            embed.add_field(name="🧱 Shards", value=shards_text, inline=False)
+        
         # Command statistics
         embed.add_field(
             name="📊 Commands",
@@ -167,22 +462,127 @@ class RTanksBot(commands.Bot):
         # Scraping statistics
         embed.add_field(
             name="🔍 Scraping Stats",
-            value=f"**Successful:** {format_number(self.scraping_successes)}\n**Failed:** {format_number(self.scraping_failures)}",
+            value=(
+                f"**Successful:** {format_number(self.scraping_successes)}\n"
+                f"**Failed:** {format_number(self.scraping_failures)}\n"
+                f"**HTTP 200/304:** {format_number(self.scraper.status_counts[200])}/{format_number(self.scraper.status_counts[304])}"
+            ),
+            inline=True
+        )
+        
+        # Snapshot cache statistics
+        cache_stats = self.scraper.cache.stats()
+        inflight_stats = self.scraper.inflight.stats()
+        limiter_stats = self.scraper.rate_limiter.stats()
+        parse_stats = self.scraper.parse_pool.stats()
+        index_stats = self.scraper.rankings_index.stats()
+        pool_stats = self.scraper.http.stats()
+        history_stats = self.scraper.history.stats() if self.scraper.history else None
+        embed.add_field(
+            name="🗄️ Cache",
+            value=(
+                f"**Hit Rate:** {cache_stats['hit_rate']}%\n"
+                f"**Entries:** {format_number(cache_stats['entries'])} ({round(cache_stats['bytes'] / 1024, 1)} KB)\n"
+                f"**Evictions:** {format_number(cache_stats['evictions'])}\n"
+                f"**Coalesced:** {format_number(inflight_stats['coalesced'])}\n"
+                f"**Not-Found Hits:** {format_number(self.scraper.negative_hits)}\n"
+                f"**Embed Hits:** {format_number(self.embed_cache.hits)}/{format_number(self.embed_cache.hits + self.embed_cache.misses)}"
+                + (f"\n**Store Hits:** {format_number(self.scraper.store.read_hits)}/{format_number(self.scraper.store.reads)}"
+                   if self.scraper.store else "")
+                + (f"\n**History:** {format_number(history_stats['players'])} players, {format_number(history_stats['points'])} points"
+                   if history_stats else "")
+            ),
+            inline=True
+        )
+        
+        # Watchlist poller statistics
+        watch_stats = self.watchlist.stats()
+        if watch_stats['players']:
+            embed.add_field(
+                name="👁️ Watchlist",
+                value=(
+                    f"**Players:** {format_number(watch_stats['players'])} ({watch_stats['watches']} watches, "
+                    f"{watch_stats['guilds']} servers)\n"
+                    f"**Polls:** {format_number(watch_stats['polls'])} ({watch_stats['budget_per_minute']}/min budget, "
+                    f"{watch_stats['overdue']} overdue)\n"
+                    f"**Notified:** {watch_stats['rank_ups']} rank-ups, {watch_stats['came_online']} online"
+                ),
+                inline=True
+            )
+        
+        # Outbound rate limiter statistics
+        embed.add_field(
+            name="🚦 Rate Limiter",
+            value=(
+                f"**Queue:** {limiter_stats['queue_depth']}\n"
+                f"**Avg Wait:** {limiter_stats['avg_wait_ms']}ms\n"
+                f"**Max Wait:** {limiter_stats['max_wait_ms']}ms"
+            ),
+            inline=True
+        )
+        
+        # Parse pool statistics
+        embed.add_field(
+            name="🧩 Parse Pool",
+            value=(
+                f"**Mode:** {parse_stats['mode']} x{parse_stats['workers']}\n"
+                f"**Pending:** {parse_stats['pending']} (max {parse_stats['max_pending']})\n"
+                f"**Avg Queue/Parse:** {parse_stats['avg_queue_ms']}/{parse_stats['avg_parse_ms']}ms"
+            ),
+            inline=True
+        )
+        
+        # Rankings index statistics
+        index_age = format_duration(index_stats['age_s']) if index_stats['age_s'] is not None else "never"
+        embed.add_field(
+            name="🏆 Rankings Index",
+            value=(
+                f"**Players:** {format_number(index_stats['players'])}\n"
+                f"**Age:** {index_age}\n"
+                f"**Refresh:** {index_stats['last_refresh_ms']}ms"
+            ),
+            inline=True
+        )
+        
+        # Connection pool statistics
+        embed.add_field(
+            name="🔌 Connection Pool",
+            value=(
+                f"**Open:** {pool_stats['open']} ({pool_stats['idle']} idle, {pool_stats['acquired']} in use)\n"
+                f"**Reused/New:** {format_number(pool_stats['reused'])}/{format_number(pool_stats['created'])}\n"
+                f"**Avg Wait:** {pool_stats['avg_wait_ms']}ms"
+            ),
             inline=True
         )
         
         # System resources
+        if health['samples']:
+            system_resources = (
+                f"**Memory:** {health['rss_mb']} MB (5m avg {health['rss_mb_5m']} MB)\n"
+                f"**CPU:** {health['cpu']}% (1m {health['cpu_1m']}%, 5m {health['cpu_5m']}%)\n"
+                f"**Loop Lag:** {health['loop_lag_ms']}ms (5m max {health['loop_lag_ms_5m_max']}ms)"
+            )
+        else:
+            system_resources = "⏳ Not sampled yet"
         embed.add_field(
             name="💻 System Resources",
-            value=f"**Memory:** {memory_usage} MB\n**CPU:** {cpu_usage}%",
+            value=system_resources,
             inline=True
         )
         
         # Website status
-        website_status = await self._check_website_status()
+        website_status = self._format_website_status(health)
+        breaker_stats = self.scraper.breaker.stats()
+        breaker_state = breaker_stats['state'].capitalize()
+        if breaker_stats['state'] != 'closed':
+            breaker_state += f" (retry in {breaker_stats['retry_in_s']:.0f}s)"
         embed.add_field(
             name="🌍 Website Status",
-            value=website_status,
+            value=(
+                f"{website_status}\n"
+                f"**Circuit:** {breaker_state}, opened {breaker_stats['opens']}x, "
+                f"{format_number(breaker_stats['rejected'])} fast-failed"
+            ),
             inline=False
         )
         
@@ -191,7 +591,16 @@ class RTanksBot(commands.Bot):
         await interaction.followup.send(embed=embed)
 
     async def _create_player_embed(self, player_data):
-        """Create a formatted embed for player data."""
+        """Create a formatted embed for player data, reusing the rendering of an unchanged snapshot."""
+        fingerprint = snapshot_fingerprint(player_data)
+        embed = self.embed_cache.get(fingerprint)
+        if embed is None:
+            embed = self._build_player_embed(player_data)
+            self.embed_cache.set(fingerprint, embed)
+        return embed
+
+    def _build_player_embed(self, player_data):
+        """Build the player embed from scratch."""
         # Create embed with activity status
         activity_status = "Online" if player_data['is_online'] else "Offline"
         profile_url = f"{RTANKS_BASE_URL}/user/{player_data['username']}"
@@ -203,15 +612,9 @@ class RTanksBot(commands.Bot):
             timestamp=datetime.now()
         )
         
-        # Player rank and basic info - make rank emoji bigger
-        rank_emoji = get_rank_emoji(player_data['rank'])
-        
-        # Extract the emoji ID from the custom Discord emoji and use it as thumbnail
-        import re
-        emoji_match = re.search(r':(\d+)>', rank_emoji)
-        if emoji_match:
-            emoji_id = emoji_match.group(1)
-            emoji_url = f"https://cdn.discordapp.com/emojis/{emoji_id}.png"
+        # Player rank and basic info - the rank emoji's image is the thumbnail
+        emoji_url = rank_emoji_url(player_data['rank'])
+        if emoji_url:
             embed.set_thumbnail(url=emoji_url)
         
         # Rank field with just the rank name, no emoji
@@ -283,24 +686,198 @@ class RTanksBot(commands.Bot):
                     inline=False
                 )
         
+        if player_data.get('stale'):
+            embed.set_footer(text="Data from ratings.ranked-rtanks.online • Website unreachable, showing last known data")
+        else:
+            embed.set_footer(text="Data from ratings.ranked-rtanks.online")
+        
+        return embed
+
+    def _create_compare_embed(self, players, missing):
+        """Create an embed showing several players side by side."""
+        embed = discord.Embed(
+            title="⚔️ Player Comparison",
+            color=0x00ff00,
+            timestamp=datetime.now()
+        )
+        
+        top_experience = max(player['experience'] for player in players)
+        for player_data in players:
+            leader = " 👑" if player_data['experience'] == top_experience and len(players) > 1 else ""
+            premium = f" {PREMIUM_EMOJI}" if player_data['premium'] else ""
+            embed.add_field(
+                name=f"{player_data['status_indicator']} {player_data['username']}{leader}",
+                value=(
+                    f"{rank_emoji(player_data['rank'])} **{player_data['rank']}**{premium}\n"
+                    f"**XP:** {format_exact_number(player_data['experience'])}\n"
+                    f"**Kills:** {format_exact_number(player_data['kills'])}\n"
+                    f"**Deaths:** {format_exact_number(player_data['deaths'])}\n"
+                    f"**K/D:** {player_data['kd_ratio']}\n"
+                    f"{GOLD_BOX_EMOJI} {format_exact_number(player_data['gold_boxes'])}"
+                ),
+                inline=True
+            )
+        
+        if missing:
+            embed.add_field(
+                name="❌ Not Found",
+                value=", ".join(f"`{name}`" for name in missing),
+                inline=False
+            )
+        
         embed.set_footer(text="Data from ratings.ranked-rtanks.online")
         
         return embed
 
-    async def _check_website_status(self):
-        """Check if the RTanks website is accessible."""
-        try:
-            start_time = time.time()
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get('https://ratings.ranked-rtanks.online/') as response:
-                    response_time = round((time.time() - start_time) * 1000, 2)
-                    if response.status == 200:
-                        return f"🟢 Online ({response_time}ms)"
-                    else:
-                        return f"🟡 Partial ({response.status})"
-        except Exception:
-            return "🔴 Offline"
+    def _create_history_embed(self, summary, period):
+        """Create an embed with a player's progress between two recorded points."""
+        titles = {'day': "last 24 hours", 'week': "last 7 days", 'month': "last 30 days", 'all': "all recorded history"}
+        embed = discord.Embed(
+            title=f"📈 {summary['username']} — {titles.get(period, period)}",
+            url=f"{RTANKS_BASE_URL}/user/{summary['username']}",
+            color=0x00ff00,
+            timestamp=datetime.now()
+        )
+        
+        labels = (
+            ('experience', "Experience"),
+            ('kills', "Kills"),
+            ('deaths', "Deaths"),
+            ('gold_boxes', "Gold Boxes"),
+        )
+        per_day = summary['per_day']
+        for column, label in labels:
+            delta = summary['deltas'][column]
+            value = f"{GOLD_BOX_EMOJI} " if column == 'gold_boxes' else ""
+            value += f"**{'+' if delta >= 0 else ''}{format_exact_number(delta)}**\n"
+            if per_day is not None:
+                value += f"{format_exact_number(per_day[column])}/day\n"
+            value += f"Now: {format_exact_number(summary['end'][column])}"
+            embed.add_field(name=label, value=value, inline=True)
+        
+        if summary['kd_ratio'] is not None:
+            embed.add_field(name="K/D in Period", value=summary['kd_ratio'], inline=True)
+        
+        if summary['points'] > 1:
+            span_text = (
+                f"Between {datetime.fromtimestamp(summary['from']):%Y-%m-%d %H:%M} and "
+                f"{datetime.fromtimestamp(summary['to']):%Y-%m-%d %H:%M} "
+                f"({format_duration(summary['elapsed_s'])}, {summary['points']} points)"
+            )
+        else:
+            span_text = (
+                f"Only one point recorded, on {datetime.fromtimestamp(summary['to']):%Y-%m-%d %H:%M}. "
+                "Progress appears after the next lookup that finds changes."
+            )
+        embed.add_field(name="Recorded", value=span_text, inline=False)
+        embed.set_footer(text="From lookups made through this bot")
+        
+        return embed
+
+    async def _send_watch_notification(self, channel_id, entry, events):
+        """Post one message about a watched player's changes to a guild's notification channel."""
+        channel = self.get_channel(channel_id) or await self.fetch_channel(channel_id)
+        lines = []
+        for event in events:
+            if event['type'] == 'rank_up':
+                lines.append(
+                    f"🎖️ Ranked up: {rank_emoji(event['old'])} {event['old']} → "
+                    f"{rank_emoji(event['new'])} **{event['new']}**"
+                )
+            elif event['type'] == 'online':
+                lines.append("🟢 Came online")
+        embed = discord.Embed(
+            title=entry.name,
+            url=f"{RTANKS_BASE_URL}/user/{entry.name}",
+            description="\n".join(lines),
+            color=0xffd700 if any(event['type'] == 'rank_up' for event in events) else 0x00ff00,
+            timestamp=datetime.now()
+        )
+        emoji_url = rank_emoji_url(entry.rank) if entry.rank else None
+        if emoji_url:
+            embed.set_thumbnail(url=emoji_url)
+        embed.set_footer(text="Watchlist • /unwatch to stop")
+        await channel.send(embed=embed)
+
+    def _serves_guild(self, guild_id):
+        """Whether a guild's events arrive at one of this process's shards."""
+        return guild_shard(guild_id, self.shard_count) in self.shard_ids
+
+    def _shard_stats_row(self):
+        """This process's statistics as stored in the shared shard stats table."""
+        latest = self.sampler.latest() or {}
+        return {
+            'pid': os.getpid(),
+            'shards': sorted(self.shard_ids or self.shards),
+            'guilds': len(self.guilds),
+            'latency_ms': round(self.latency * 1000, 1) if math.isfinite(self.latency) else None,
+            'commands': self.commands_processed,
+            'successes': self.scraping_successes,
+            'failures': self.scraping_failures,
+            'cache_hit_rate': self.scraper.cache.stats()['hit_rate'],
+            'rss_mb': latest.get('rss_mb'),
+        }
+
+    async def _format_shards(self):
+        """Per-shard (or per-process) lines plus a total for /botstats; empty with a single shard."""
+        lines = []
+        if self.shard_stats:
+            rows = await self.shard_stats.read()
+            if not any(row['process'] == self.process_index for row in rows):
+                rows.append(dict(self._shard_stats_row(), process=self.process_index, age_s=0.0))
+            rows.sort(key=lambda row: row['process'])
+            for row in rows:
+                latency = f"{row['latency_ms']}ms" if row['latency_ms'] is not None else "connecting"
+                memory = f", {row['rss_mb']} MB" if row.get('rss_mb') is not None else ""
+                here = " (this)" if row['process'] == self.process_index else ""
+                lines.append(
+                    f"**#{row['process']}{here}** shards {format_shard_ids(row['shards'])}: "
+                    f"{format_number(row['guilds'])} servers, {latency}, "
+                    f"{format_number(row['commands'])} commands{memory}"
+                )
+            memory = sum(row['rss_mb'] for row in rows if row.get('rss_mb') is not None)
+            lines.append(
+                f"**Total:** {format_number(sum(row['guilds'] for row in rows))} servers, "
+                f"{format_number(sum(row['commands'] for row in rows))} commands, "
+                f"{round(memory, 1)} MB across {len(rows)} processes"
+            )
+            return "\n".join(lines)
+        
+        if len(self.shards) <= 1:
+            return ""
+        guild_counts = {}
+        for guild in self.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+        for shard_id, latency in self.latencies:
+            latency = f"{round(latency * 1000, 1)}ms" if math.isfinite(latency) else "connecting"
+            lines.append(f"**Shard {shard_id}:** {format_number(guild_counts.get(shard_id, 0))} servers, {latency}")
+        lines.append(f"**Total:** {format_number(len(self.guilds))} servers across {len(self.shards)} shards")
+        return "\n".join(lines)
+
+    async def _wait_for_probe_slot(self):
+        """Take the probe's request from the website budget before the sampler starts timing it."""
+        await self.scraper.rate_limiter.acquire()
+
+    async def _probe_website(self):
+        """Return the HTTP status of the RTanks website; used by the background sampler."""
+        session = await self.scraper.http.get_session()
+        timeout = aiohttp.ClientTimeout(total=STATS_PROBE_TIMEOUT)
+        async with session.head(f"{self.scraper.base_url}/", timeout=timeout) as response:
+            return response.status
+
+    @staticmethod
+    def _format_website_status(health):
+        """Describe website reachability from the latest sample."""
+        if not health['samples']:
+            return "⏳ Not sampled yet"
+        if health['upstream_status'] is None:
+            status = "🔴 Offline"
+        elif health['upstream_status'] == 200:
+            status = f"🟢 Online ({health['upstream_ms']}ms)"
+        else:
+            status = f"🟡 Partial ({health['upstream_status']})"
+        trend = f"5m avg {health['upstream_ms_5m']}ms, " if health['upstream_ms_5m'] is not None else ""
+        return f"{status}\n{trend}{health['availability_5m']}% reachable, sampled {health['age_s']:.0f}s ago"
 
     async def on_command_error(self, ctx, error):
         """Global error handler."""
@@ -308,5 +885,9 @@ class RTanksBot(commands.Bot):
         
     async def close(self):
         """Clean up when bot is closing."""
+        await self.sampler.stop()
+        await self.watchlist.stop()
+        if self.shard_stats:
+            await self.shard_stats.stop()
         await self.scraper.close()
         await super().close()
@@ -0,0 +1,81 @@
+"""
+Circuit breaker for requests to the RTanks ratings website.
+After repeated failures requests fail fast instead of waiting for timeouts.
+"""
+
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with timed half-open trials."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at = 0.0
+
+        # Statistics
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self):
+        """Return True if a request may be sent now. In half-open state one trial is let through."""
+        now = time.monotonic()
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_started_at = now
+            return True
+        # A trial that never reported back does not keep the circuit half-open forever
+        if self.state == self.HALF_OPEN and now - self._trial_started_at >= self.reset_timeout:
+            self._trial_started_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self):
+        """Raise CircuitOpenError if a request may not be sent now."""
+        if not self.allow():
+            raise CircuitOpenError(f"circuit open, retrying in {self.retry_in():.0f}s")
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opens += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def retry_in(self):
+        """Seconds until the next trial request is allowed (0 if requests are allowed)."""
+        if self.state == self.CLOSED:
+            return 0.0
+        started = self._opened_at if self.state == self.OPEN else self._trial_started_at
+        return max(0.0, self.reset_timeout - (time.monotonic() - started))
+
+    def stats(self):
+        """Return breaker statistics as a dictionary."""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'opens': self.opens,
+            'rejected': self.rejected,
+            'retry_in_s': round(self.retry_in(), 1),
+        }
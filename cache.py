@@ -0,0 +1,121 @@
+"""
+Player snapshot cache for the RTanks Discord Bot.
+Keeps recently parsed player data in memory with per-entry TTLs and LRU eviction.
+"""
+
+import copy
+import json
+import time
+from collections import OrderedDict
+
+
+def normalize_username(username):
+    """Normalize a username for use as a cache key."""
+    return username.strip().lower()
+
+
+def estimate_size(value):
+    """Approximate the in-memory footprint of a snapshot in bytes."""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class SnapshotCache:
+    """Bounded in-memory cache of parsed player snapshots."""
+
+    def __init__(self, max_entries=1000, max_bytes=8 * 1024 * 1024, default_ttl=120):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        # key -> (expires_at, size, value), oldest first
+        self._entries = OrderedDict()
+        self.total_bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, username):
+        return self.get(username, count=False) is not None
+
+    def get(self, username, count=True):
+        """Return a copy of the cached snapshot or None if missing or expired."""
+        key = normalize_username(username)
+        entry = self._entries.get(key)
+        if entry is None:
+            if count:
+                self.misses += 1
+            return None
+
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            if count:
+                self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, username, value, ttl=None):
+        """Store a snapshot, evicting least recently used entries if over budget."""
+        key = normalize_username(username)
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + ttl, size, copy.deepcopy(value))
+        self.total_bytes += size
+        self._evict()
+
+    def invalidate(self, username):
+        """Drop a single entry from the cache."""
+        key = normalize_username(username)
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        """Drop every entry from the cache."""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self):
+        """Return cache statistics as a dictionary."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
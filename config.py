@@ -46,15 +46,119 @@ PREMIUM_EMOJI = '<:emoji_33:1395399425102184609>'   # Premium emoji
 RTANKS_BASE_URL = "https://ratings.ranked-rtanks.online"
 RTANKS_TIMEOUT = 30  # seconds
 
+# Shared HTTP connection pool
+HTTP_POOL_LIMIT = 20            # open connections in total
+HTTP_POOL_LIMIT_PER_HOST = 8    # open connections to the ratings website
+HTTP_DNS_CACHE_TTL = 300        # seconds resolved addresses are reused
+HTTP_KEEPALIVE_TIMEOUT = 60     # seconds an idle connection is kept open
+HTTP_WARM_CONNECTIONS = 2       # connections opened at startup
+HTTP_KEEP_WARM_INTERVAL = 45    # seconds between pings while idle (0 disables)
+
+# Profile pages are read in chunks and decoded incrementally
+STREAM_PROFILE_FETCH = True
+STREAM_CHUNK_SIZE = 16 * 1024        # bytes per read
+MAX_PROFILE_BYTES = 2 * 1024 * 1024  # stop reading a profile page after this many bytes
+PROFILE_ENCODING = 'utf-8'           # used when the response does not declare a charset
+
 # Bot configuration
 BOT_PREFIX = "!"
 DEFAULT_EMBED_COLOR = 0x00ff00  # Green
 ERROR_EMBED_COLOR = 0xff0000    # Red
 WARNING_EMBED_COLOR = 0xffa500  # Orange
 
-# Rate limiting
-REQUEST_DELAY_MIN = 0.5  # minimum delay between requests (seconds)
-REQUEST_DELAY_MAX = 1.5  # maximum delay between requests (seconds)
+# Rate limiting (shared token bucket for every request to the website)
+REQUEST_RATE = 2.0  # sustained requests per second
+REQUEST_BURST = 5   # requests allowed back-to-back before queueing
+
+# Player snapshot cache
+PLAYER_CACHE_TTL = 120  # seconds a parsed profile is served from memory
+PLAYER_CACHE_MAX_ENTRIES = 1000
+PLAYER_CACHE_MAX_BYTES = 8 * 1024 * 1024  # approximate, based on serialized size
+
+# Names that resolved to no player are remembered briefly so repeats don't hit the website
+NEGATIVE_CACHE_TTL = 60
+NEGATIVE_CACHE_MAX_ENTRIES = 5000
+
+# Rendered player embeds kept for unchanged snapshots
+EMBED_CACHE_MAX_ENTRIES = 2000
+
+# Circuit breaker for the website: fail fast after repeated failures or timeouts
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures that open the circuit
+BREAKER_RESET_TIMEOUT = 30     # seconds before a trial request is let through
+
+# Conditional revalidation (ETag / Last-Modified) of previously downloaded pages
+VALIDATOR_CACHE_TTL = 6 * 3600  # seconds a parsed page is kept for 304 reuse
+VALIDATOR_CACHE_MAX_ENTRIES = 2000
+VALIDATOR_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Persistent snapshot store (SQLite); set the path to None to disable
+SNAPSHOT_STORE_PATH = 'snapshots.db'
+SNAPSHOT_STORE_FRESHNESS = PLAYER_CACHE_TTL  # seconds a stored snapshot is served without refetching
+SNAPSHOT_STORE_MAX_AGE = 7 * 86400           # stored snapshots older than this are pruned
+SNAPSHOT_STORE_MAX_BYTES = 64 * 1024 * 1024  # oldest snapshots are pruned beyond this total size
+
+# Player history for /history: append-only record file (None keeps it in memory only)
+HISTORY_PATH = 'history.bin'
+HISTORY_MIN_INTERVAL = 600             # seconds between kept points while a player keeps changing
+HISTORY_FULL_RESOLUTION = 86400        # points younger than this are all kept
+HISTORY_HOURLY_FOR = 7 * 86400         # then one point per hour up to this age, one per day after
+HISTORY_RETENTION = 180 * 86400        # points older than this are dropped
+HISTORY_COMPACT_INTERVAL = 6 * 3600    # seconds between file compactions
+
+# Rankings page index used for fallback lookups
+RANKINGS_REFRESH_INTERVAL = 300  # seconds between background refreshes
+RANKINGS_MAX_AGE = 900           # older indexes are bypassed in favour of a live search
+
+# Bulk lookups (/compare)
+BULK_CONCURRENCY = 4       # lookups of one bulk request running at the same time
+COMPARE_MIN_PLAYERS = 2
+COMPARE_MAX_PLAYERS = 10
+
+# Watchlists (/watch): players polled in the background for rank-ups and coming online
+WATCHLIST_PATH = 'watchlist.json'
+WATCHLIST_REQUESTS_PER_MINUTE = 20    # poll budget shared by every guild's watchlist
+WATCHLIST_ONLINE_INTERVAL = 120       # seconds between polls of a player who is online
+WATCHLIST_NEAR_RANK_INTERVAL = 300    # ... of a player close to the next rank
+WATCHLIST_IDLE_INTERVAL = 900         # ... of anyone else
+WATCHLIST_NEAR_RANK_FRACTION = 0.05   # "close" = within this fraction of the next rank's experience
+WATCHLIST_MAX_BACKOFF = 3600          # longest wait between polls after repeated failures
+WATCHLIST_MAX_PER_GUILD = 25
+
+# Sharding. SHARD_COUNT 0 lets Discord choose and runs every shard in one process; with
+# SHARD_PROCESSES > 1, main.py supervises that many worker processes, each owning a range of
+# SHARD_COUNT shards. Workers share the snapshot store, so a profile one fetched is served by all.
+SHARD_COUNT = 0
+SHARD_PROCESSES = 1
+SHARD_STATS_PATH = SNAPSHOT_STORE_PATH or 'shards.db'  # per-process stats table read by /botstats
+SHARD_STATS_INTERVAL = 15       # seconds between stats updates from each worker
+SHARD_RESTART_BACKOFF_MAX = 60  # longest wait before restarting a crashed worker
+SHARD_IDENTIFY_INTERVAL = 5     # seconds per shard between worker starts (Discord's IDENTIFY limit)
+SHARD_METRICS_PORT = 8081       # worker N serves /metrics on this port + N
+# The website budgets (REQUEST_RATE/REQUEST_BURST, WATCHLIST_REQUESTS_PER_MINUTE) are totals:
+# each worker gets an equal share of them, and refreshes the rankings index N times less often.
+
+# Background health sampling shown in /botstats
+STATS_SAMPLE_INTERVAL = 15   # seconds between samples (each one probes the website once)
+STATS_SAMPLE_HISTORY = 300   # seconds of samples kept for trends
+STATS_PROBE_TIMEOUT = 10     # seconds before the website counts as unreachable
+
+# Logging (records are written by a background thread)
+LOG_LEVEL = 'INFO'
+LOG_FILE = 'bot.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024  # rotate the log file at this size
+LOG_BACKUP_COUNT = 3             # rotated files kept (bot.log.1 ... bot.log.3)
+
+# Request tracing: fraction of commands traced (0 disables) and the duration (seconds)
+# above which a traced command's span tree is logged
+TRACE_SAMPLE_RATE = 0.0
+TRACE_SLOW_THRESHOLD = 2.0
+
+# Page extraction backend: 'fast' (html.parser events, no tree) or 'bs4' (BeautifulSoup tree)
+EXTRACTION_BACKEND = 'fast'
+
+# HTML parsing worker pool: 'thread', 'process' (uses several cores) or 'inline' (on the event loop)
+PARSE_EXECUTOR = 'thread'
+PARSE_WORKERS = 2
 
 # Equipment lists for parsing
 TURRET_NAMES = [
@@ -68,18 +172,19 @@ HULL_NAMES = [
     'Mammoth', 'Smoky', 'Crusader'
 ]
 
-# Known rank names for parsing
-RANK_NAMES = [
-    'Recruit', 'Private', 'Gefreiter', 'Corporal', 'Master Corporal',
-    'Sergeant', 'Staff Sergeant', 'Master Sergeant', 'First Sergeant',
-    'Sergeant Major', 'Warrant Officer', 'Master Warrant Officer',
-    'Second Lieutenant', 'First Lieutenant', 'Captain', 'Major',
-    'Lieutenant Colonel', 'Colonel', 'Brigadier', 'Major General',
-    'Lieutenant General', 'General', 'Marshal', 'Field Marshal',
-    'Commander', 'Lieutenant Commander', 'Captain Commander',
-    'Major Commander', 'Lieutenant Colonel Commander', 'Colonel Commander',
-    'Brigadier Commander', 'Generalissimo', 'Legend', 'Legend Premium'
-]
+# Russian equipment names as shown on the ratings website
+TURRET_TRANSLATIONS = {
+    'Смоки': 'Smoky', 'Рельса': 'Rail', 'Рикошет': 'Ricochet',
+    'Изида': 'Isida', 'Фриз': 'Freeze', 'Огнемет': 'Flamethrower',
+    'Гром': 'Thunder', 'Молот': 'Hammer', 'Вулкан': 'Vulcan',
+    'Твинс': 'Twins', 'Шафт': 'Shaft', 'Страйкер': 'Striker'
+}
+
+HULL_TRANSLATIONS = {
+    'Хантер': 'Hunter', 'Мамонт': 'Mammoth', 'Титан': 'Titan',
+    'Васп': 'Wasp', 'Викинг': 'Viking', 'Хорнет': 'Hornet',
+    'Диктатор': 'Dictator'
+}
 
 # User agents for web scraping
 USER_AGENTS = [
@@ -0,0 +1,107 @@
+"""
+Rendered embed cache for the RTanks Discord Bot.
+Stores built player embeds keyed by a fingerprint of the snapshot fields they were
+built from, so a repeated lookup of unchanged data skips formatting.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import discord
+
+# Snapshot fields the player embed is built from; anything else doesn't change it
+EMBED_FIELDS = (
+    'username', 'rank', 'experience', 'max_experience', 'is_online', 'premium', 'kills',
+    'deaths', 'kd_ratio', 'gold_boxes', 'group', 'stale',
+)
+
+
+def snapshot_fingerprint(player_data):
+    """
+    Hashable key of the parts of a snapshot shown in the player embed. A plain tuple is
+    several times cheaper than serializing and digesting the snapshot, and compares exactly.
+    """
+    equipment = player_data.get('equipment') or {}
+    return (
+        tuple(player_data.get(field) for field in EMBED_FIELDS),
+        tuple(equipment.get('turrets') or ()),
+        tuple(equipment.get('hulls') or ()),
+    )
+
+
+def _embed_state(embed):
+    # The embed's set slots except the timestamp, with its field list and dicts copied so
+    # the caller's embed and the cache don't share them. Restoring these onto a bare Embed
+    # is several times cheaper than copy.copy (which goes through __reduce_ex__ for slotted
+    # classes) or Embed.from_dict, either of which costs about as much as a rebuild
+    state = []
+    for name in discord.Embed.__slots__:
+        if name == '_timestamp' or not hasattr(embed, name):
+            continue
+        value = getattr(embed, name)
+        if isinstance(value, list):
+            value = [dict(item) if isinstance(item, dict) else item for item in value]
+        elif isinstance(value, dict):
+            value = dict(value)
+        state.append((name, value))
+    return tuple(state)
+
+
+class EmbedCache:
+    """LRU cache of built embeds (as their slot values) keyed by snapshot fingerprint."""
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._embeds = OrderedDict()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._embeds)
+
+    def get(self, fingerprint):
+        """
+        Return a copy of the cached embed stamped with the current time, or None.
+        The copy is shallow: its fields, footer and thumbnail are shared with the cached
+        embed, so callers may set attributes but must not change those in place.
+        """
+        state = self._embeds.get(fingerprint)
+        if state is None:
+            self.misses += 1
+            return None
+        self._embeds.move_to_end(fingerprint)
+        self.hits += 1
+        embed = discord.Embed.__new__(discord.Embed)
+        for name, value in state:
+            setattr(embed, name, value)
+        # An aware datetime: a naive one is converted with a slow local timezone lookup
+        embed.timestamp = datetime.now(timezone.utc)
+        return embed
+
+    def set(self, fingerprint, embed):
+        """Store an embed under the fingerprint; attributes set on it later are not cached."""
+        if self.max_entries <= 0:
+            return
+        self._embeds[fingerprint] = _embed_state(embed)
+        self._embeds.move_to_end(fingerprint)
+        while len(self._embeds) > self.max_entries:
+            self._embeds.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached embed."""
+        self._embeds.clear()
+
+    def stats(self):
+        """Return cache statistics as a dictionary."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._embeds),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
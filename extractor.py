@@ -0,0 +1,316 @@
+"""
+Field extraction for RTanks profile pages.
+All patterns are compiled once at import and grouped by site locale. Instead of
+running every pattern over the whole page, one lowercased copy of the page is scanned
+for field labels and each pattern is only tried at the positions of its own label.
+"""
+
+import re
+
+from config import TURRET_NAMES, HULL_NAMES, TURRET_TRANSLATIONS, HULL_TRANSLATIONS
+
+# Locale tags: 'ru' and 'en' site layouts, 'raw' for locale-neutral JSON keys
+LOCALES = ('ru', 'en', 'raw')
+
+# Current/max experience like "105613/125000", tried in order with re.search
+EXPERIENCE_RATIO_PATTERNS = [
+    re.compile(r'(\d{1,3}(?:\s?\d{3})*)\s*/\s*(\d{1,3}(?:\s?\d{3})*)'),  # Current/max format with spaces
+    re.compile(r'(\d{1,3}(?:,\d{3})*)\s*/\s*(\d{1,3}(?:,\d{3})*)'),     # Current/max format with commas
+    re.compile(r'(\d+)\s*/\s*(\d+)'),                                     # Simple current/max format
+]
+
+# Labelled fields: field -> [(locale, label, pattern)] in priority order.
+# Every pattern starts with its literal label, which is what the combined scan looks for.
+FIELD_PATTERNS = {
+    'experience': [
+        ('en', 'Experience', r'Experience[^0-9]*(\d{1,3}(?:,?\d{3})*)'),
+        ('ru', 'Опыт', r'Опыт[^0-9]*(\d{1,3}(?:,?\d{3})*)'),
+        ('raw', '"experience"', r'"experience"[^0-9]*(\d{1,3}(?:,?\d{3})*)'),
+    ],
+    'kills': [
+        ('ru', 'Уничтожил', r'Уничтожил[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('en', 'Destroyed', r'Destroyed[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('raw', '"destroyed"', r'"destroyed"[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+    ],
+    'deaths': [
+        ('en', 'Hit', r'Hit\s*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('ru', 'Подбит', r'Подбит[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('ru', 'Падение', r'Падение[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('raw', '"deaths"', r'"deaths"[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+    ],
+    'kd_ratio': [
+        ('ru', 'У/П', r'У/П[^0-9]*(\d+\.?\d*)'),
+        ('en', 'U/P', r'U/P[^0-9]*(\d+\.?\d*)'),
+        ('raw', '"efficiency"', r'"efficiency"[^0-9]*(\d+\.?\d*)'),
+        ('ru', 'По эффективности', r'По эффективности[^0-9]*#\d+[^0-9]*(\d+\.?\d*)'),
+    ],
+    'premium': [
+        ('en', 'Premium', r'Premium[^A-Za-z]*Yes'),
+        ('ru', 'Премиум', r'Премиум[^А-Яа-я]*Да'),
+    ],
+    'group': [
+        ('en', 'Group', r'Group[^A-Za-z]*(\w+)'),
+        ('ru', 'Группа', r'Группа[^А-Яа-я]*([А-Яа-я\w]+)'),
+    ],
+    'gold_boxes': [
+        ('ru', 'Поймано золотых ящиков', r'Поймано золотых ящиков[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('en', 'Caught gold boxes', r'Caught gold boxes[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('en', 'gold boxes', r'gold boxes[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+        ('ru', 'золотых ящиков', r'золотых ящиков[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'),
+    ],
+}
+
+_ONLINE_STATUS_RE = re.compile(
+    r'<span[^>]*\bid=["\']?online_status["\']?[^>]*>(.*?)</span>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Output fields of a player snapshot -> raw page fields they are derived from
+FIELD_REQUIREMENTS = {
+    'experience': ('experience',),
+    'max_experience': ('experience',),
+    'rank': ('experience',),
+    'kills': ('kills',),
+    'deaths': ('deaths',),
+    'kd_ratio': ('kd_ratio',),
+    'premium': ('premium',),
+    'group': ('group',),
+    'gold_boxes': ('gold_boxes',),
+    'is_online': ('online_status',),
+    'status_indicator': ('online_status',),
+    'equipment': ('equipment',),
+}
+
+def find_literals(html, lower_literals, literal_res, start=0, end=None, lowered=None):
+    """
+    Return {literal index: [positions]} for every case-insensitive occurrence of each literal.
+    Uses str.find on a lowercased copy of the page, which is much faster than an
+    IGNORECASE regex; falls back to the regexes when lowercasing would shift offsets.
+    Overlapping occurrences are all reported, in ascending order.
+    """
+    end = len(html) if end is None else end
+    if lowered is None:
+        lowered = html.lower()
+    positions = {}
+    if len(lowered) == len(html):
+        for index, literal in enumerate(lower_literals):
+            pos = lowered.find(literal, start, end)
+            while pos != -1:
+                positions.setdefault(index, []).append(pos)
+                pos = lowered.find(literal, pos + 1, end)
+    else:
+        for index, pattern in enumerate(literal_res):
+            pos = start
+            while True:
+                match = pattern.search(html, pos, end)
+                if not match:
+                    break
+                positions.setdefault(index, []).append(match.start())
+                pos = match.start() + 1
+    return positions
+
+
+class FieldExtractor:
+    """Extracts labelled profile fields with per-field first-match semantics."""
+
+    def __init__(self, locales=LOCALES):
+        self.locales = tuple(locales)
+
+        labels = []
+        self.fields = {}
+        for field, patterns in FIELD_PATTERNS.items():
+            compiled = []
+            for locale, label, pattern in patterns:
+                if locale != 'raw' and locale not in self.locales:
+                    continue
+                if label not in labels:
+                    labels.append(label)
+                compiled.append((labels.index(label), re.compile(pattern, re.IGNORECASE)))
+            self.fields[field] = compiled
+
+        self.labels = labels
+        self._lower_labels = [label.lower() for label in labels]
+        self._label_res = [re.compile(re.escape(label), re.IGNORECASE) for label in labels]
+
+    def label_positions(self, html, start=0, end=None, lowered=None):
+        """Return {label index: [positions]} for every label occurrence in html[start:end]."""
+        return find_literals(html, self._lower_labels, self._label_res, start, end, lowered)
+
+    def extract(self, html, fields=None, lowered=None):
+        """
+        Return {field: match} for every field found in html.
+        For each field the first pattern (in priority order) that matches anywhere wins,
+        and its leftmost match is returned, exactly as sequential re.search calls would.
+        """
+        positions = self.label_positions(html, lowered=lowered)
+        results = {}
+        for field in (fields or self.fields):
+            for label_index, pattern in self.fields.get(field, ()):
+                match = self._first_match(pattern, html, positions.get(label_index, ()))
+                if match:
+                    results[field] = match
+                    break
+        return results
+
+    @staticmethod
+    def _first_match(pattern, html, positions):
+        for pos in positions:
+            match = pattern.match(html, pos)
+            if match:
+                return match
+        return None
+
+
+class EquipmentExtractor:
+    """
+    Reads installed turrets and hulls from the equipment cards of a profile page.
+    The page is split into cards once, at every mention of a known equipment name;
+    each card is read for its modification level and "Installed: Yes" flag.
+    """
+
+    # Cards never span more than this many characters
+    MAX_CARD_LENGTH = 2000
+
+    _INSTALLED_LABELS = ('installed', 'установленный')
+    _INSTALLED_VALUE_RE = re.compile(
+        r'(?:Installed|Установленный)(?:\s|:|&nbsp;|<[^>]*>)*(Yes|Да|No|Нет)\b',
+        re.IGNORECASE
+    )
+    _KIND_HINT_RE = re.compile(r'(turret|башня|пушка)|(hull|корпус)', re.IGNORECASE)
+
+    def __init__(self, turrets=TURRET_NAMES, hulls=HULL_NAMES,
+                 turret_translations=TURRET_TRANSLATIONS, hull_translations=HULL_TRANSLATIONS):
+        # name -> (English name, default kind, ambiguous)
+        names = {}
+        both = set(turrets) & set(hulls)
+        for english in list(turrets) + list(turret_translations.values()):
+            kind = 'hulls' if english in both and english in hull_translations.values() else 'turrets'
+            names.setdefault(english, (english, kind, english in both))
+        for english in list(hulls) + list(hull_translations.values()):
+            names.setdefault(english, (english, 'hulls', english in both))
+        for russian, english in turret_translations.items():
+            names.setdefault(russian, (english, 'turrets', False))
+        for russian, english in hull_translations.items():
+            names.setdefault(russian, (english, 'hulls', False))
+
+        self.names = list(names)
+        self._info = list(names.values())
+        self._lower_names = [name.lower() for name in self.names]
+        self._name_res = [re.compile(re.escape(name), re.IGNORECASE) for name in self.names]
+        # Name must not be glued to a longer word; an optional "M2"/"М2" follows it
+        self._tail_re = re.compile(r'\s*[MМ](\d)|(?!\w)', re.IGNORECASE)
+
+    def _card_starts(self, html, lowered):
+        found = find_literals(html, self._lower_names, self._name_res, lowered=lowered)
+        starts = {}
+        for index, positions in found.items():
+            length = len(self.names[index])
+            for pos in positions:
+                if pos > 0 and (html[pos - 1].isalnum() or html[pos - 1] == '_'):
+                    continue
+                tail = self._tail_re.match(html, pos + length)
+                if not tail:
+                    continue
+                # Prefer the longest name starting at a position
+                if pos not in starts or length > starts[pos][1]:
+                    starts[pos] = (index, length, tail.group(1))
+        return sorted((pos, index, mod) for pos, (index, _, mod) in starts.items())
+
+    def _is_installed(self, html, lowered, start, end):
+        for label in self._INSTALLED_LABELS:
+            pos = lowered.find(label, start, end)
+            while pos != -1:
+                match = self._INSTALLED_VALUE_RE.match(html, pos)
+                if match and match.end() <= end:
+                    return match.group(1).lower() in ('yes', 'да')
+                pos = lowered.find(label, pos + 1, end)
+        return False
+
+    def extract(self, html, lowered=None):
+        """Return {'turrets': [...], 'hulls': [...]} with entries like "Smoky M2", in page order."""
+        if lowered is None:
+            lowered = html.lower()
+        equipment = {'turrets': [], 'hulls': []}
+        cards = self._card_starts(html, lowered)
+        for i, (start, index, mod) in enumerate(cards):
+            end = cards[i + 1][0] if i + 1 < len(cards) else len(html)
+            end = min(end, start + self.MAX_CARD_LENGTH)
+            if not self._is_installed(html, lowered, start, end):
+                continue
+
+            english, kind, ambiguous = self._info[index]
+            if ambiguous:
+                hint = self._KIND_HINT_RE.search(html, start, end)
+                if hint:
+                    kind = 'turrets' if hint.group(1) else 'hulls'
+
+            item = f"{english} M{mod or 0}"
+            if item not in equipment[kind]:
+                equipment[kind].append(item)
+        return equipment
+
+
+class StreamingExtractor:
+    """
+    Watches a profile page arrive in chunks and reports when every requested field has been seen.
+    Only completeness is tracked here; the received text is parsed normally afterwards.
+    Fields whose absence cannot be proven early (premium, equipment) complete only at end of body.
+    """
+
+    # Text kept from the previous chunk so labels split across chunks are still found
+    OVERLAP = 512
+    # Matches ending this close to the end of received text may still be growing ("1,23" + "4,567")
+    GUARD = 32
+
+    def __init__(self, fields, extractor=None):
+        unknown = set(fields) - set(FIELD_REQUIREMENTS)
+        if unknown:
+            raise ValueError(f"Unknown player fields: {', '.join(sorted(unknown))}")
+        extractor = extractor or DEFAULT_EXTRACTOR
+        self.pending = {raw for field in fields for raw in FIELD_REQUIREMENTS[field]}
+        self._patterns = {}
+        for field in self.pending:
+            if field == 'online_status':
+                self._patterns[field] = [_ONLINE_STATUS_RE]
+            elif field in extractor.fields:
+                self._patterns[field] = [pattern for _, pattern in extractor.fields[field]]
+        if 'experience' in self._patterns:
+            self._patterns['experience'] = EXPERIENCE_RATIO_PATTERNS + self._patterns['experience']
+        self._tail = ''
+
+    @property
+    def complete(self):
+        return not self.pending
+
+    def feed(self, text):
+        """Scan a newly received piece of decoded text. Returns True once all fields are found."""
+        window = self._tail + text
+        limit = len(window) - self.GUARD
+        for field in list(self.pending):
+            for pattern in self._patterns.get(field, ()):
+                match = pattern.search(window)
+                if match and match.end() <= limit:
+                    self.pending.discard(field)
+                    break
+        self._tail = window[-self.OVERLAP:]
+        return self.complete
+
+
+def find_experience_ratio(html):
+    """Return (current, max) experience from the first current/max pattern that matches, or None."""
+    for pattern in EXPERIENCE_RATIO_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            try:
+                return (
+                    int(match.group(1).replace(',', '').replace(' ', '')),
+                    int(match.group(2).replace(',', '').replace(' ', ''))
+                )
+            except ValueError:
+                continue
+    return None
+
+
+# Compiled once at import: every locale's labels, in the priority order that matches legacy results
+DEFAULT_EXTRACTOR = FieldExtractor()
+EQUIPMENT_EXTRACTOR = EquipmentExtractor()
@@ -0,0 +1,389 @@
+"""
+Player history for the RTanks Discord Bot.
+Every freshly fetched snapshot adds a point (time, experience, kills, deaths, gold boxes)
+to the player's series. Series are kept as compact array columns in memory and as
+fixed-width records in an append-only file that is periodically compacted, with old
+points thinned to hourly and then daily resolution.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from cache import normalize_username
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('experience', 'kills', 'deaths', 'gold_boxes')
+
+# File records are all RECORD_SIZE bytes: a kind byte, the player id, then the payload
+KIND_POINT = 1
+KIND_NAME = 2
+POINT_RECORD = struct.Struct('<B3xII4I')     # kind, player id, time, one value per column
+NAME_RECORD = struct.Struct('<B3xI20s')      # kind, player id, next 20 bytes of the UTF-8 name
+RECORD_SIZE = POINT_RECORD.size
+UINT32_MAX = 0xFFFFFFFF
+
+# /history periods in seconds (None = everything kept)
+PERIODS = {
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 30 * 86400,
+    'all': None,
+}
+
+
+def _uint32(value):
+    try:
+        return min(max(int(value or 0), 0), UINT32_MAX)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PlayerSeries:
+    """Points of one player as parallel uint32 arrays, oldest first."""
+
+    __slots__ = ('name', 'times', 'columns')
+
+    def __init__(self, name):
+        self.name = name
+        self.times = array('I')
+        self.columns = tuple(array('I') for _ in COLUMNS)
+
+    def __len__(self):
+        return len(self.times)
+
+    def values(self, index):
+        return tuple(column[index] for column in self.columns)
+
+    def add(self, timestamp, values, min_interval):
+        """
+        Add a point; returns False if it changed nothing. Unchanged values are skipped,
+        and a point arriving within min_interval of the one before the last replaces the
+        last, so the series keeps one point per interval plus the newest.
+        """
+        if self.times:
+            if timestamp < self.times[-1] or self.values(-1) == values:
+                return False
+            if len(self.times) > 1 and self.times[-1] - self.times[-2] < min_interval:
+                self.times[-1] = timestamp
+                for column, value in zip(self.columns, values):
+                    column[-1] = value
+                return True
+        self.times.append(timestamp)
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        return True
+
+    def index_at(self, timestamp):
+        """Index of the last point at or before timestamp, else the first point after it."""
+        return max(0, bisect_right(self.times, timestamp) - 1)
+
+    def downsample(self, now, full_resolution, hourly_for, retention):
+        """Keep the last point of each hour/day bucket for older points and drop expired ones."""
+        start = bisect_left(self.times, now - retention) if retention else 0
+        recent = bisect_left(self.times, now - full_resolution)
+        kept = []
+        for index in range(start, min(recent, len(self.times))):
+            bucket_size = 3600 if now - self.times[index] <= hourly_for else 86400
+            bucket = self.times[index] // bucket_size
+            if kept and kept[-1][0] == bucket_size and kept[-1][1] == bucket:
+                kept[-1] = (bucket_size, bucket, index)
+            else:
+                kept.append((bucket_size, bucket, index))
+        indexes = [index for _, _, index in kept] + list(range(max(start, recent), len(self.times)))
+        if len(indexes) == len(self.times):
+            return 0
+        removed = len(self.times) - len(indexes)
+        self.times = array('I', (self.times[i] for i in indexes))
+        self.columns = tuple(array('I', (column[i] for i in indexes)) for column in self.columns)
+        return removed
+
+    def nbytes(self):
+        return sum(column.buffer_info()[1] * column.itemsize for column in (self.times, *self.columns))
+
+
+class HistoryStore:
+    """Per-player time series with an append-only record file and periodic compaction."""
+
+    def __init__(self, path, min_interval=600, full_resolution=86400, hourly_for=7 * 86400,
+                 retention=180 * 86400, flush_interval=5.0, compact_interval=6 * 3600):
+        self.path = path
+        self.min_interval = min_interval
+        self.full_resolution = full_resolution
+        self.hourly_for = hourly_for
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+
+        # normalized name -> PlayerSeries / file player id
+        self.series = {}
+        self._ids = {}
+        self._next_id = 1
+
+        # All file work happens on one dedicated thread, in submission order
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='history')
+        self._pending = []
+        self._wakeup = None
+        self._writer_task = None
+        self._last_compact = time.time()
+        self._closed = False
+
+        # Statistics
+        self.points_added = 0
+        self.writes = 0
+        self.compactions = 0
+        self.downsampled = 0
+
+        self._load()
+
+    # Loading
+
+    def _load(self):
+        """Replay the record file into memory."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        names = {}
+        series_by_id = {}
+        replayed = 0
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.error(f"Error reading history file {self.path}: {e}")
+            return
+        # A torn final record from a crash is ignored
+        usable = len(data) - len(data) % RECORD_SIZE
+        for offset in range(0, usable, RECORD_SIZE):
+            kind = data[offset]
+            if kind == KIND_NAME:
+                _, player_id, chunk = NAME_RECORD.unpack_from(data, offset)
+                names[player_id] = names.get(player_id, b'') + chunk.rstrip(b'\0')
+            elif kind == KIND_POINT:
+                _, player_id, timestamp, *values = POINT_RECORD.unpack_from(data, offset)
+                series = series_by_id.get(player_id)
+                if series is None:
+                    name = names.get(player_id, b'').decode('utf-8', 'replace')
+                    if not name:
+                        continue
+                    series = self._register(name, player_id)
+                    series_by_id[player_id] = series
+                series.add(timestamp, tuple(values), self.min_interval)
+                replayed += 1
+        # Compact the file on the first flush if it holds much more than it replays to
+        if replayed > 2 * self.point_count() + 1000:
+            self._last_compact = 0.0
+        logger.info(f"Loaded history for {len(self.series)} player(s) from {self.path}")
+
+    def _register(self, name, player_id=None):
+        key = normalize_username(name)
+        if player_id is None:
+            player_id = self._next_id
+        self._next_id = max(self._next_id, player_id + 1)
+        series = PlayerSeries(name)
+        self.series[key] = series
+        self._ids[key] = player_id
+        return series
+
+    @staticmethod
+    def _name_records(player_id, name):
+        encoded = name.encode('utf-8')
+        chunk = NAME_RECORD.size - 8
+        return [
+            NAME_RECORD.pack(KIND_NAME, player_id, encoded[start:start + chunk])
+            for start in range(0, len(encoded), chunk)
+        ]
+
+    # Recording
+
+    def record(self, player_data, timestamp=None):
+        """
+        Add a point from a freshly fetched snapshot. Stale and partial snapshots are ignored,
+        and so are rankings-page fallback results, whose experience is guessed and whose
+        combat stats are all zero.
+        """
+        if self._closed or not player_data or player_data.get('stale') or player_data.get('partial'):
+            return False
+        if player_data.get('source') == 'rankings':
+            return False
+        name = player_data.get('username')
+        if not name:
+            return False
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        values = tuple(_uint32(player_data.get(column)) for column in COLUMNS)
+
+        key = normalize_username(name)
+        series = self.series.get(key)
+        if series is None:
+            series = self._register(name)
+            self._pending.extend(self._name_records(self._ids[key], name))
+        if not series.add(timestamp, values, self.min_interval):
+            return False
+        self.points_added += 1
+        # The record is replayed through the same rule on load, so it reproduces the same series
+        self._pending.append(POINT_RECORD.pack(KIND_POINT, self._ids[key], timestamp, *values))
+        if self.path:
+            self._ensure_writer()
+        return True
+
+    def _ensure_writer(self):
+        if self._writer_task is None or self._writer_task.done():
+            self._wakeup = asyncio.Event()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def _writer(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _append_sync(self, data):
+        with open(self.path, 'ab') as f:
+            f.write(data)
+
+    async def flush(self):
+        """Append queued records to the file, compacting it first when due."""
+        if not self.path:
+            self._pending = []
+            return
+        if time.time() - self._last_compact >= self.compact_interval:
+            await self.compact()
+            return
+        if not self._pending:
+            return
+        data = b''.join(self._pending)
+        self._pending = []
+        try:
+            await self._run(self._append_sync, data)
+        except Exception as e:
+            logger.error(f"Error writing history file: {e}")
+            return
+        self.writes += 1
+
+    # Maintenance
+
+    @classmethod
+    def _pack_series(cls, copies):
+        records = []
+        for player_id, name, times, columns in copies:
+            records.extend(cls._name_records(player_id, name))
+            for index, timestamp in enumerate(times):
+                records.append(POINT_RECORD.pack(
+                    KIND_POINT, player_id, timestamp, *(column[index] for column in columns)
+                ))
+        return b''.join(records)
+
+    def _rewrite_sync(self, copies):
+        data = self._pack_series(copies)
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+    async def compact(self):
+        """Downsample old points, drop expired players and rewrite the file from memory."""
+        now = int(time.time())
+        removed = 0
+        for key in list(self.series):
+            series = self.series[key]
+            removed += series.downsample(now, self.full_resolution, self.hourly_for, self.retention)
+            if not len(series):
+                del self.series[key]
+                del self._ids[key]
+        self._last_compact = time.time()
+        # Everything queued is already in memory, so the rewritten file includes it.
+        # Array copies are cheap here; packing them into records happens on the file thread.
+        self._pending = []
+        copies = [
+            (self._ids[key], series.name, series.times[:], tuple(column[:] for column in series.columns))
+            for key, series in self.series.items()
+        ]
+        try:
+            await self._run(self._rewrite_sync, copies)
+        except Exception as e:
+            logger.error(f"Error compacting history file: {e}")
+            return removed
+        self.compactions += 1
+        self.downsampled += removed
+        logger.info(f"Compacted history: {len(self.series)} player(s), {removed} point(s) downsampled")
+        return removed
+
+    async def close(self):
+        """Write queued records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        if self._pending and self.path:
+            try:
+                await self._run(self._append_sync, b''.join(self._pending))
+            except Exception as e:
+                logger.error(f"Error writing history file: {e}")
+            self._pending = []
+        self._executor.shutdown(wait=False)
+
+    # Queries
+
+    def summary(self, username, period=None, now=None):
+        """
+        Progress of a player over the last `period` seconds (None = all history) as a dict
+        with the first and last point used, deltas and per-day rates; None if never recorded.
+        """
+        series = self.series.get(normalize_username(username))
+        if series is None or not len(series):
+            return None
+        now = int(now if now is not None else time.time())
+        first = series.index_at(now - period) if period else 0
+        last = len(series) - 1
+        start_values = series.values(first)
+        end_values = series.values(last)
+        elapsed = series.times[last] - series.times[first]
+        days = elapsed / 86400
+
+        deltas = {column: end - start for column, start, end in zip(COLUMNS, start_values, end_values)}
+        kills, deaths = deltas['kills'], deltas['deaths']
+        return {
+            'username': series.name,
+            'from': series.times[first],
+            'to': series.times[last],
+            'elapsed_s': elapsed,
+            'points': last - first + 1,
+            'start': dict(zip(COLUMNS, start_values)),
+            'end': dict(zip(COLUMNS, end_values)),
+            'deltas': deltas,
+            'per_day': {column: round(delta / days, 1) for column, delta in deltas.items()} if days >= 1 / 24 else None,
+            'kd_ratio': f"{kills / deaths:.2f}" if deaths > 0 else (f"{kills:.2f}" if kills else None),
+        }
+
+    def point_count(self):
+        return sum(len(series) for series in self.series.values())
+
+    def stats(self):
+        """Return history statistics as a dictionary."""
+        memory = sum(series.nbytes() for series in self.series.values())
+        return {
+            'players': len(self.series),
+            'points': self.point_count(),
+            'bytes': memory,
+            'bytes_per_player': round(memory / len(self.series)) if self.series else 0,
+            'pending': len(self._pending),
+            'points_added': self.points_added,
+            'writes': self.writes,
+            'compactions': self.compactions,
+            'downsampled': self.downsampled,
+        }
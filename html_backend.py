@@ -0,0 +1,290 @@
+"""
+Pluggable HTML extraction backends for the RTanks scraper.
+Labelled stats and equipment cards are read with regex on the raw page (see extractor.py);
+a backend supplies the parts that need element structure: the hidden online status span
+and the rows of the rankings tables. The default 'fast' backend walks html.parser events
+without building a tree; 'bs4' builds a BeautifulSoup tree and is kept as a fallback.
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from urllib.parse import unquote
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+PROFILE_LINK_RE = re.compile(r'/user/([^/?#]+)')
+
+# Elements that never have content (BeautifulSoup closes them immediately)
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer',
+))
+
+# Text inside these is not part of get_text() in BeautifulSoup
+STRING_CONTAINERS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+
+# BeautifulSoup collapses whitespace-only strings to ' ' or '\n' outside these
+PRESERVE_WHITESPACE = frozenset(('pre', 'textarea'))
+ASCII_SPACES = ' \n\t\x0c\r'
+
+
+class ExtractionBackend(ABC):
+    """Interface for reading structured parts of RTanks pages."""
+
+    name = None
+
+    @abstractmethod
+    def online_status(self, html):
+        """Stripped text of the first <span id="online_status">, or None if there is none."""
+
+    @abstractmethod
+    def rankings_rows(self, html):
+        """
+        Rows of every <table>, in table order, as {'text': lowercased row text,
+        'cells': [stripped td/th texts], 'user': name from the first /user/ link or None}.
+        """
+
+
+class BeautifulSoupBackend(ExtractionBackend):
+    """Builds a full BeautifulSoup tree per page."""
+
+    name = 'bs4'
+
+    def online_status(self, html):
+        span = BeautifulSoup(html, 'html.parser').find('span', id='online_status')
+        return span.get_text(strip=True) if span else None
+
+    def rankings_rows(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        rows = []
+        for table in soup.find_all('table'):
+            for row in table.find_all('tr'):
+                link = row.find('a', href=PROFILE_LINK_RE)
+                rows.append({
+                    'text': row.get_text().lower(),
+                    'cells': [cell.get_text().strip() for cell in row.find_all(['td', 'th'])],
+                    'user': unquote(PROFILE_LINK_RE.search(link['href']).group(1)) if link else None
+                })
+        return rows
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _TreelessParser(HTMLParser):
+    """
+    html.parser event handler that keeps only a stack of open element names, mirroring
+    how BeautifulSoup's html.parser builder nests and closes tags and joins text, and
+    lets subclasses collect text for the elements they care about.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # (tag name, marker or None) for every open element
+        self.stack = []
+        # Void elements opened without '/>', whose explicit end tag is ignored
+        self.already_closed = {}
+        self.pending = []
+        self.hidden = 0
+        self.preserve = 0
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._end(tag)
+            self.already_closed[tag] = self.already_closed.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs)
+        self._end(tag)
+
+    def handle_endtag(self, tag):
+        if self.already_closed.get(tag):
+            self.already_closed[tag] -= 1
+            return
+        self._end(tag)
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+
+    def close(self):
+        super().close()
+        self.flush()
+
+    def flush(self):
+        """Emit the text seen since the last tag as one string, as BeautifulSoup stores it."""
+        if not self.pending:
+            return
+        data = ''.join(self.pending)
+        self.pending = []
+        if not self.preserve and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        if not self.hidden:
+            self.text(data)
+
+    def _start(self, tag, attrs):
+        self.flush()
+        self.stack.append((tag, self.open_element(tag, attrs)))
+        if tag in STRING_CONTAINERS:
+            self.hidden += 1
+        if tag in PRESERVE_WHITESPACE:
+            self.preserve += 1
+
+    def _end(self, tag):
+        self.flush()
+        # Close up to the most recent open element of that name, if any
+        for position in range(len(self.stack) - 1, -1, -1):
+            if self.stack[position][0] == tag:
+                for name, marker in reversed(self.stack[position:]):
+                    if name in STRING_CONTAINERS:
+                        self.hidden -= 1
+                    if name in PRESERVE_WHITESPACE:
+                        self.preserve -= 1
+                    if marker is not None:
+                        self.close_element(name, marker)
+                del self.stack[position:]
+                return
+
+    def open_element(self, tag, attrs):
+        """Return a marker to attach to the element (passed back to close_element), or None."""
+        return None
+
+    def close_element(self, tag, marker):
+        pass
+
+    def text(self, data):
+        pass
+
+
+class _OnlineStatusParser(_TreelessParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = None
+
+    def open_element(self, tag, attrs):
+        if tag == 'span' and self.parts is None and dict(attrs).get('id') == 'online_status':
+            self.parts = []
+            return self.parts
+        return None
+
+    def close_element(self, tag, marker):
+        # The span is the only collector, and nothing after it is needed
+        raise _StopParsing
+
+    def text(self, data):
+        if self.parts is not None:
+            self.parts.append(data)
+
+
+class _RankingsParser(_TreelessParser):
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+        # Open collectors of each kind, innermost last, so text goes straight to the ones that want it
+        self.open = {'table': [], 'tr': [], 'cell': []}
+
+    def open_element(self, tag, attrs):
+        if tag == 'table':
+            table = []
+            self.tables.append(table)
+            self.open['table'].append(table)
+            return 'table'
+        if tag == 'tr':
+            row = {'text': [], 'cells': [], 'user': None}
+            # A row belongs to every table it is nested in, as with find_all('tr')
+            for table in self.open['table']:
+                table.append(row)
+            self.open['tr'].append(row)
+            return 'tr'
+        if tag in ('td', 'th'):
+            cell = []
+            for row in self.open['tr']:
+                row['cells'].append(cell)
+            self.open['cell'].append(cell)
+            return 'cell'
+        if tag == 'a' and self.open['tr']:
+            href = dict(attrs).get('href')
+            match = PROFILE_LINK_RE.search(href) if href is not None else None
+            if match:
+                for row in self.open['tr']:
+                    if row['user'] is None:
+                        row['user'] = unquote(match.group(1))
+        return None
+
+    def close_element(self, tag, marker):
+        # Elements close innermost first, so the closing one is the last opened of its kind
+        self.open[marker].pop()
+
+    def text(self, data):
+        for row in self.open['tr']:
+            row['text'].append(data)
+        for cell in self.open['cell']:
+            cell.append(data)
+
+
+class TreelessBackend(ExtractionBackend):
+    """
+    Reads the needed elements from html.parser events without building a tree.
+    Matches the BeautifulSoup backend except for unknown named entities such as
+    '&foo;', which BeautifulSoup turns into '&foo' and this backend leaves as is.
+    """
+
+    name = 'fast'
+
+    def online_status(self, html):
+        # Nothing to find: skip tokenizing the page at all
+        if 'online_status' not in html:
+            return None
+        parser = _OnlineStatusParser()
+        try:
+            parser.feed(html)
+            parser.close()
+        except _StopParsing:
+            pass
+        if parser.parts is None:
+            return None
+        return ''.join(part.strip() for part in parser.parts)
+
+    def rankings_rows(self, html):
+        parser = _RankingsParser()
+        parser.feed(html)
+        parser.close()
+        rows = []
+        for table_rows in parser.tables:
+            for row in table_rows:
+                rows.append({
+                    'text': ''.join(row['text']).lower(),
+                    'cells': [''.join(cell).strip() for cell in row['cells']],
+                    'user': row['user'],
+                })
+        return rows
+
+
+BACKENDS = {backend.name: backend for backend in (TreelessBackend(), BeautifulSoupBackend())}
+
+
+def get_backend(name):
+    """Return the backend registered under name, falling back to BeautifulSoup."""
+    backend = BACKENDS.get(name)
+    if backend is None:
+        logger.warning(f"Unknown extraction backend {name!r}, using 'bs4'")
+        backend = BACKENDS['bs4']
+    return backend
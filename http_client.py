@@ -0,0 +1,152 @@
+"""
+Shared HTTP client for the RTanks Discord Bot.
+One tuned aiohttp session and connection pool for every outbound request,
+with connection warm-up and a keep-warm ping so requests skip DNS and TLS setup.
+"""
+
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """Owns the process-wide aiohttp session and reports connection pool statistics."""
+
+    def __init__(self, headers=None, timeout=30, limit=20, limit_per_host=8,
+                 dns_cache_ttl=300, keepalive_timeout=60, keep_warm_interval=45, limiter=None):
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.keep_warm_interval = keep_warm_interval
+        # Optional rate limiter that warm-up and keep-warm requests also go through
+        self.limiter = limiter
+
+        self._session = None
+        self._connector = None
+        self._keep_warm_task = None
+        self._keep_warm_url = None
+        self.last_request = 0.0
+
+        # Statistics
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.pings = 0
+
+    def _trace_config(self):
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.requests += 1
+            self.last_request = time.monotonic()
+
+        async def on_queued_start(session, ctx, params):
+            ctx.queued_at = time.monotonic()
+
+        async def on_queued_end(session, ctx, params):
+            waited = time.monotonic() - getattr(ctx, 'queued_at', time.monotonic())
+            self.queued += 1
+            self.total_queue_wait += waited
+            self.max_queue_wait = max(self.max_queue_wait, waited)
+
+        async def on_create_end(session, ctx, params):
+            self.connections_created += 1
+
+        async def on_reuse(session, ctx, params):
+            self.connections_reused += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_queued_start.append(on_queued_start)
+        trace.on_connection_queued_end.append(on_queued_end)
+        trace.on_connection_create_end.append(on_create_end)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    async def get_session(self):
+        """Get or create the shared session."""
+        if self._session is None or self._session.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers,
+                trace_configs=[self._trace_config()]
+            )
+        return self._session
+
+    async def _ping(self, url):
+        if self.limiter:
+            await self.limiter.acquire()
+        session = await self.get_session()
+        async with session.head(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            self.pings += 1
+            return response.status
+
+    async def warm_up(self, url, connections=2):
+        """Open a few pooled connections to url's host (DNS + TCP + TLS) before the first real request."""
+        start = time.monotonic()
+        results = await asyncio.gather(*[self._ping(url) for _ in range(max(1, connections))], return_exceptions=True)
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures:
+            logger.warning(f"HTTP warm-up: {len(failures)}/{len(results)} connection(s) failed: {failures[0]}")
+        logger.info(f"HTTP warm-up finished in {(time.monotonic() - start) * 1000:.0f}ms")
+
+    async def _keep_warm(self):
+        while True:
+            await asyncio.sleep(self.keep_warm_interval)
+            # Only ping when the pool has been idle long enough for connections to be dropped
+            if time.monotonic() - self.last_request < self.keep_warm_interval:
+                continue
+            try:
+                await self._ping(self._keep_warm_url)
+            except Exception as e:
+                logger.debug(f"Keep-warm ping failed: {e}")
+
+    def start_keep_warm(self, url):
+        """Start pinging url periodically while the pool is idle."""
+        self._keep_warm_url = url
+        if self.keep_warm_interval and (self._keep_warm_task is None or self._keep_warm_task.done()):
+            self._keep_warm_task = asyncio.get_running_loop().create_task(self._keep_warm())
+
+    async def close(self):
+        """Stop the keep-warm ping and close the session."""
+        if self._keep_warm_task is not None:
+            self._keep_warm_task.cancel()
+            self._keep_warm_task = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def stats(self):
+        """Return connection pool statistics as a dictionary."""
+        idle = acquired = 0
+        if self._connector is not None and not self._connector.closed:
+            # aiohttp does not expose pool occupancy publicly
+            idle = sum(len(conns) for conns in getattr(self._connector, '_conns', {}).values())
+            acquired = len(getattr(self._connector, '_acquired', ()))
+        return {
+            'open': idle + acquired,
+            'idle': idle,
+            'acquired': acquired,
+            'requests': self.requests,
+            'created': self.connections_created,
+            'reused': self.connections_reused,
+            'queued': self.queued,
+            'avg_wait_ms': round(self.total_queue_wait / self.queued * 1000, 2) if self.queued else 0.0,
+            'max_wait_ms': round(self.max_queue_wait * 1000, 2),
+            'pings': self.pings,
+        }
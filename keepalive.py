@@ -1,4 +1,6 @@
-from flask import Flask
+from flask import Flask, Response
+
+from metrics import REGISTRY
 
 app = Flask('')
 
@@ -6,5 +8,9 @@ app = Flask('')
 def home():
     return "I'm alive!"
 
-def run():
-    app.run(host='0.0.0.0', port=8080)
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+def run(port=8080):
+    app.run(host='0.0.0.0', port=port)
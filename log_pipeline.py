@@ -0,0 +1,60 @@
+"""
+Logging pipeline for the RTanks Discord Bot.
+Log calls only enqueue the record; a background thread writes it to a
+rotating log file and the console, so disk I/O never runs on the event loop.
+"""
+
+import logging
+import logging.handlers
+import queue
+
+
+class LogPipeline:
+    """Root logger -> QueueHandler -> QueueListener thread -> rotating file + console."""
+
+    def __init__(self, level='INFO', path='bot.log', max_bytes=5 * 1024 * 1024, backup_count=3,
+                 fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s'):
+        self.level = level
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.fmt = fmt
+
+        self.queue = queue.SimpleQueue()
+        self._listener = None
+        self._queue_handler = None
+
+    def start(self):
+        """Route the root logger through the queue and start the writer thread."""
+        if self._listener is not None:
+            return self
+        formatter = logging.Formatter(self.fmt)
+        handlers = [logging.StreamHandler()]
+        if self.path:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8'
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(self.level)
+        self._queue_handler = logging.handlers.QueueHandler(self.queue)
+        root.addHandler(self._queue_handler)
+
+        self._listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        return self
+
+    def stop(self):
+        """Write out queued records, stop the writer thread and close the handlers."""
+        if self._listener is None:
+            return
+        logging.getLogger().removeHandler(self._queue_handler)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self._queue_handler = None
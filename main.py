@@ -6,29 +6,36 @@ Main entry point for the Discord bot application.
 
 import asyncio
 import logging
+import multiprocessing
 import os
+import signal
+import time
 from dotenv import load_dotenv
 import threading
 from keepalive import run
 
 from bot import RTanksBot
-
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
+from log_pipeline import LogPipeline
+from shards import shard_ranges, format_shard_ids, process_path
+from config import (
+    LOG_LEVEL, LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, SHARD_COUNT, SHARD_PROCESSES,
+    SHARD_RESTART_BACKOFF_MAX, SHARD_IDENTIFY_INTERVAL, SHARD_METRICS_PORT
 )
 
 logger = logging.getLogger(__name__)
 
-async def main():
+
+def start_logging(path=LOG_FILE):
+    """Write logs to the file and the console from a background thread."""
+    return LogPipeline(
+        level=LOG_LEVEL,
+        path=path,
+        max_bytes=LOG_MAX_BYTES,
+        backup_count=LOG_BACKUP_COUNT
+    ).start()
+
+
+async def main(shard_ids=None, shard_count=None, process_index=None, process_count=1):
     """Main function to start the bot."""
     # Get Discord token from environment
     token = os.getenv('DISCORD_TOKEN')
@@ -37,10 +44,25 @@ async def main():
         return
     
     # Create and run the bot
-    bot = RTanksBot()
+    bot = RTanksBot(
+        shard_ids=shard_ids, shard_count=shard_count, process_index=process_index, process_count=process_count
+    )
+    
+    if process_index is not None:
+        # The supervisor stops workers with SIGTERM; close the bot so its stores are flushed
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.ensure_future(bot.close())
+            )
+        except NotImplementedError:
+            pass
     
     try:
-        logger.info("Starting RTanks Discord Bot...")
+        if process_index is None:
+            logger.info("Starting RTanks Discord Bot...")
+        else:
+            logger.info(f"Starting RTanks Discord Bot worker {process_index} "
+                        f"(shards {format_shard_ids(shard_ids)} of {shard_count})...")
         await bot.start(token)
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
@@ -50,9 +72,101 @@ async def main():
         if not bot.is_closed():
             await bot.close()
 
+
+def run_worker(process_index, process_count, shard_ids, shard_count):
+    """Entry point of a worker process: one bot running a range of the shards."""
+    load_dotenv()
+    log_pipeline = start_logging(process_path(LOG_FILE, process_index))
+    # Each worker has its own metrics registry, served on its own port
+    threading.Thread(target=run, args=(SHARD_METRICS_PORT + process_index,), daemon=True).start()
+    try:
+        asyncio.run(main(shard_ids, shard_count, process_index, process_count))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log_pipeline.stop()
+
+
+def supervise(shard_count, processes):
+    """
+    Run the shards in worker processes and restart any that exit, waiting longer after
+    each quick crash (up to SHARD_RESTART_BACKOFF_MAX seconds). Workers start one after
+    another, leaving each one's shards time to IDENTIFY before the next one connects.
+    """
+    context = multiprocessing.get_context('spawn')
+    ranges = shard_ranges(shard_count, processes)
+    workers = {}
+    restarts = {index: 0 for index in range(len(ranges))}
+    next_start = {}
+    offset = 0.0
+    for index, shard_ids in enumerate(ranges):
+        next_start[index] = time.monotonic() + offset
+        offset += SHARD_IDENTIFY_INTERVAL * len(shard_ids)
+    started_at = {}
+    stopping = False
+
+    def terminate(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, terminate)
+    logger.info(f"Supervising {len(ranges)} worker processes for {shard_count} shards")
+
+    try:
+        while not stopping:
+            now = time.monotonic()
+            for index, shard_ids in enumerate(ranges):
+                worker = workers.get(index)
+                if worker is not None and worker.is_alive():
+                    continue
+                if worker is not None:
+                    ran_for = now - started_at[index]
+                    # A worker that ran for a while before exiting starts over with no delay
+                    restarts[index] = 0 if ran_for > SHARD_RESTART_BACKOFF_MAX * 5 else restarts[index] + 1
+                    delay = min(2 ** restarts[index], SHARD_RESTART_BACKOFF_MAX) if restarts[index] else 0
+                    logger.error(f"Worker {index} exited with code {worker.exitcode} after {ran_for:.0f}s, "
+                                 f"restarting in {delay}s")
+                    next_start[index] = now + delay
+                    workers[index] = None
+                if now < next_start[index]:
+                    continue
+                worker = context.Process(
+                    target=run_worker, args=(index, len(ranges), shard_ids, shard_count),
+                    name=f'rtanks-worker-{index}'
+                )
+                worker.start()
+                workers[index] = worker
+                started_at[index] = now
+                logger.info(f"Started worker {index} (pid {worker.pid}, shards {format_shard_ids(shard_ids)})")
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Stopping worker processes...")
+        running = [worker for worker in workers.values() if worker is not None and worker.is_alive()]
+        for worker in running:
+            worker.terminate()
+        for worker in running:
+            worker.join(timeout=30)
+            if worker.is_alive():
+                worker.kill()
+
+
 if __name__ == "__main__":
+    # Load environment variables
+    load_dotenv()
+    log_pipeline = start_logging()
+    processes = int(os.getenv('SHARD_PROCESSES', SHARD_PROCESSES))
+    shard_count = int(os.getenv('SHARD_COUNT', SHARD_COUNT))
     try:
         threading.Thread(target=run).start()
-        asyncio.run(main())
+        if processes > 1:
+            supervise(max(shard_count, processes), processes)
+        elif shard_count:
+            asyncio.run(main(shard_count=shard_count))
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Application terminated by user")
+    finally:
+        log_pipeline.stop()
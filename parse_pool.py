@@ -0,0 +1,102 @@
+"""
+Worker pool for HTML parsing in the RTanks Discord Bot.
+Keeps HTML extraction and regex work off the discord.py event loop.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+PARSE_MODES = ('thread', 'process', 'inline')
+
+
+def _timed_call(fn, submitted_at, args):
+    """Run fn in a worker and report when it started and finished (wall clock, valid across processes)."""
+    started_at = time.time()
+    result = fn(*args)
+    return result, submitted_at, started_at, time.time()
+
+
+class ParsePool:
+    """Runs parse functions in a thread or process pool and tracks queue metrics."""
+
+    def __init__(self, mode='thread', workers=None):
+        if mode not in PARSE_MODES:
+            raise ValueError(f"Unknown parse executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._executor = None
+
+        # Statistics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.total_queue_wait = 0.0
+        self.total_run_time = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.mode == 'process':
+                # spawn avoids forking a process that already runs the event loop and Flask thread
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='parse'
+                )
+            logger.info(f"Started {self.mode} parse pool with {self.workers} worker(s)")
+        return self._executor
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in the pool and return its (picklable) result."""
+        self.submitted += 1
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        try:
+            if self.mode == 'inline':
+                result, submitted_at, started_at, finished_at = _timed_call(fn, time.time(), args)
+            else:
+                loop = asyncio.get_running_loop()
+                result, submitted_at, started_at, finished_at = await loop.run_in_executor(
+                    self._get_executor(), _timed_call, fn, time.time(), args
+                )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.total_queue_wait += max(0.0, started_at - submitted_at)
+        self.total_run_time += finished_at - started_at
+        return result
+
+    def shutdown(self, wait=False):
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        """Return pool statistics as a dictionary."""
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_queue_ms': round(self.total_queue_wait / self.completed * 1000, 2) if self.completed else 0.0,
+            'avg_parse_ms': round(self.total_run_time / self.completed * 1000, 2) if self.completed else 0.0,
+        }
@@ -0,0 +1,114 @@
+"""
+In-memory index of the RTanks rankings page.
+A background task refreshes it on a schedule so fallback lookups are a dictionary hit.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+
+from cache import normalize_username
+
+logger = logging.getLogger(__name__)
+
+
+class RankingsIndex:
+    """Periodically refreshed map of lowercase username -> parsed rankings row."""
+
+    def __init__(self, scraper, interval=300, max_age=900):
+        self.scraper = scraper
+        self.interval = interval
+        self.max_age = max_age
+
+        self.players = {}
+        self._task = None
+
+        # Statistics
+        self.refreshed_at = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def age(self):
+        """Seconds since the last successful refresh, or None if never refreshed."""
+        if self.refreshed_at is None:
+            return None
+        return time.monotonic() - self.refreshed_at
+
+    def is_fresh(self):
+        """Whether the index is recent enough to answer lookups on its own."""
+        return self.age is not None and self.age <= self.max_age
+
+    def lookup(self, username):
+        """Return a copy of the player's rankings data, or None if they are not listed."""
+        entry = self.players.get(normalize_username(username))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        player_data = copy.deepcopy(entry)
+        player_data['username'] = username
+        return player_data
+
+    async def refresh(self):
+        """Fetch and index the rankings tables once."""
+        from scraper import build_rankings_index
+
+        start = time.monotonic()
+        try:
+            rows = await self.scraper._get_rankings_rows()
+            if not rows:
+                raise ValueError("rankings page returned no rows")
+            players = await self.scraper.parse_pool.run(build_rankings_index, rows)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Rankings index refresh failed: {e}")
+            return False
+
+        self.players = players
+        self.last_duration = time.monotonic() - start
+        self.total_duration += self.last_duration
+        self.refreshed_at = time.monotonic()
+        self.refreshes += 1
+        logger.info(f"Rankings index refreshed: {len(players)} players in {self.last_duration * 1000:.0f}ms")
+        return True
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background refresh task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        """Return index statistics as a dictionary."""
+        age = self.age
+        return {
+            'players': len(self.players),
+            'age_s': round(age, 1) if age is not None else None,
+            'fresh': self.is_fresh(),
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_refresh_ms': round(self.last_duration * 1000, 2),
+            'avg_refresh_ms': round(self.total_duration / self.refreshes * 1000, 2) if self.refreshes else 0.0,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
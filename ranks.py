@@ -0,0 +1,128 @@
+"""
+RTanks rank model.
+One sorted threshold table, built once at import, answers experience -> rank,
+rank -> next threshold and rank -> emoji; Legend levels are computed arithmetically.
+"""
+
+import re
+from bisect import bisect_right
+
+from config import RANK_EMOJIS
+
+# (rank, experience needed) in ascending order; emoji N belongs to the Nth rank
+RANKS = (
+    ('Recruit', 0),
+    ('Private', 100),
+    ('Gefreiter', 500),
+    ('Corporal', 1500),
+    ('Master Corporal', 3700),
+    ('Sergeant', 7100),
+    ('Staff Sergeant', 12300),
+    ('Master Sergeant', 20000),
+    ('First Sergeant', 29000),
+    ('Sergeant Major', 41000),
+    ('Warrant Officer 1', 57000),
+    ('Warrant Officer 2', 76000),
+    ('Warrant Officer 3', 98000),
+    ('Warrant Officer 4', 125000),
+    ('Warrant Officer 5', 156000),
+    ('Third Lieutenant', 192000),
+    ('Second Lieutenant', 233000),
+    ('First Lieutenant', 280000),
+    ('Captain', 332000),
+    ('Major', 390000),
+    ('Lieutenant Colonel', 455000),
+    ('Colonel', 527000),
+    ('Brigadier', 606000),
+    ('Major General', 692000),
+    ('Lieutenant General', 787000),
+    ('General', 889000),
+    ('Marshal', 1000000),
+    ('Field Marshal', 1122000),
+    ('Commander', 1255000),
+    ('Generalissimo', 1400000),
+)
+
+# Legend 1 starts at LEGEND_EXPERIENCE; every LEGEND_STEP above it is one more level
+LEGEND_EXPERIENCE = 1600000
+LEGEND_STEP = 200000
+LEGEND_EMOJI = 31
+
+RANK_NAMES = tuple(name for name, _ in RANKS)
+THRESHOLDS = tuple(threshold for _, threshold in RANKS)
+_POSITIONS = {name.lower(): position for position, name in enumerate(RANK_NAMES)}
+
+_EMOJI_ID_RE = re.compile(r':(\d+)>')
+
+
+def _emoji_url(emoji):
+    match = _EMOJI_ID_RE.search(emoji)
+    return f"https://cdn.discordapp.com/emojis/{match.group(1)}.png" if match else None
+
+
+# CDN image of each rank emoji, used as the embed thumbnail
+RANK_EMOJI_URLS = {index: _emoji_url(emoji) for index, emoji in RANK_EMOJIS.items()}
+
+
+def legend_level(experience):
+    """Legend level for an experience total (0 below Legend)."""
+    if experience < LEGEND_EXPERIENCE:
+        return 0
+    return 1 + (experience - LEGEND_EXPERIENCE) // LEGEND_STEP
+
+
+def rank_for_experience(experience):
+    """Rank name for an experience total, e.g. 'Captain' or 'Legend 4'."""
+    level = legend_level(experience)
+    if level:
+        return f'Legend {level}'
+    return RANK_NAMES[max(0, bisect_right(THRESHOLDS, experience) - 1)]
+
+
+def next_threshold_for_experience(experience):
+    """Experience needed for the rank after the one this total has."""
+    level = legend_level(experience)
+    if level:
+        return LEGEND_EXPERIENCE + level * LEGEND_STEP
+    position = bisect_right(THRESHOLDS, experience)
+    return THRESHOLDS[position] if position < len(THRESHOLDS) else LEGEND_EXPERIENCE
+
+
+def _position(rank):
+    """Index into RANKS, len(RANKS) for Legend ranks, or None if unknown."""
+    key = rank.strip().lower().replace('_', ' ')
+    if key.startswith('legend'):
+        return len(RANKS)
+    return _POSITIONS.get(key)
+
+
+def next_rank_threshold(rank):
+    """Experience needed for the rank after `rank` (0 if the rank is unknown)."""
+    position = _position(rank)
+    if position is None:
+        return 0
+    if position == len(RANKS):
+        parts = rank.split()
+        level = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1
+        return LEGEND_EXPERIENCE + level * LEGEND_STEP
+    if position + 1 < len(THRESHOLDS):
+        return THRESHOLDS[position + 1]
+    return LEGEND_EXPERIENCE
+
+
+def rank_emoji_index(rank):
+    """RANK_EMOJIS key for a rank; Legend and unknown ranks use the Legend emoji."""
+    position = _position(rank)
+    if position is None or position == len(RANKS):
+        return LEGEND_EMOJI
+    return position + 1
+
+
+def rank_emoji(rank):
+    """Custom Discord emoji for a rank."""
+    return RANK_EMOJIS.get(rank_emoji_index(rank), '🏆')
+
+
+def rank_emoji_url(rank):
+    """CDN image URL of a rank's emoji, or None for non-custom emojis."""
+    return RANK_EMOJI_URLS.get(rank_emoji_index(rank))
@@ -0,0 +1,70 @@
+"""
+Outbound request rate limiting for the RTanks Discord Bot.
+A token bucket shared by every request made to the ratings website.
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token-bucket limiter that serves waiters in FIFO order."""
+
+    def __init__(self, rate, burst):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        # asyncio.Lock wakes waiters in the order they arrived
+        self._lock = asyncio.Lock()
+
+        # Statistics
+        self.waiting = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and consume it. Returns the time spent waiting."""
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.total_wait += waited
+        if waited > 0.001:
+            self.delayed += 1
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def stats(self):
+        """Return limiter statistics as a dictionary."""
+        self._refill()
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'tokens': round(self._tokens, 2),
+            'queue_depth': self.waiting,
+            'acquired': self.acquired,
+            'delayed': self.delayed,
+            'avg_wait_ms': round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+            'max_wait_ms': round(self.max_wait * 1000, 2),
+        }
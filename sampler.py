@@ -0,0 +1,140 @@
+"""
+Background health sampler for the RTanks Discord Bot.
+Collects CPU, memory, event loop lag and website reachability on an interval
+so /botstats can render from recent samples without measuring on demand.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class StatsSampler:
+    """Periodically records process and upstream health into a fixed-size ring buffer."""
+
+    def __init__(self, probe=None, interval=15, history=300, lag_tick=0.5, probe_timeout=10,
+                 before_probe=None):
+        # probe: async callable returning the website's HTTP status; it is timed by the sampler
+        self.probe = probe
+        # before_probe: async callable awaited first, outside the timing and the timeout
+        # (e.g. waiting for a rate limiter slot)
+        self.before_probe = before_probe
+        self.interval = interval
+        self.lag_tick = lag_tick
+        self.probe_timeout = probe_timeout
+        self.samples = deque(maxlen=max(1, int(history // interval) + 1))
+
+        self._process = psutil.Process(os.getpid())
+        self._max_lag = 0.0
+        self._tasks = []
+
+    def start(self):
+        """Start the sampling and loop lag tasks."""
+        if self._tasks:
+            return
+        # The first cpu_percent(None) call only sets the baseline
+        self._process.cpu_percent(None)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._watch_lag()), loop.create_task(self._run())]
+
+    async def stop(self):
+        """Stop the background tasks."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _watch_lag(self):
+        """Measure how late short sleeps wake up; the worst delay per sample is recorded."""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.lag_tick)
+            lag = time.monotonic() - start - self.lag_tick
+            self._max_lag = max(self._max_lag, lag)
+
+    async def _probe_upstream(self):
+        if self.probe is None:
+            return None, None
+        if self.before_probe is not None:
+            await self.before_probe()
+        start = time.monotonic()
+        try:
+            status = await asyncio.wait_for(self.probe(), timeout=self.probe_timeout)
+        except Exception as e:
+            logger.debug(f"Website probe failed: {e}")
+            return None, None
+        return status, round((time.monotonic() - start) * 1000, 2)
+
+    async def sample(self):
+        """Take one sample now and append it to the ring buffer."""
+        status, latency = await self._probe_upstream()
+        sample = {
+            'time': time.time(),
+            'cpu': round(self._process.cpu_percent(None), 1),
+            'rss_mb': round(self._process.memory_info().rss / 1024 / 1024, 2),
+            'loop_lag_ms': round(self._max_lag * 1000, 2),
+            'upstream_status': status,
+            'upstream_ms': latency,
+        }
+        self._max_lag = 0.0
+        self.samples.append(sample)
+        return sample
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.error(f"Error taking stats sample: {e}")
+            await asyncio.sleep(self.interval)
+
+    def latest(self):
+        """Return the most recent sample, or None before the first one."""
+        return self.samples[-1] if self.samples else None
+
+    def _window(self, seconds):
+        cutoff = time.time() - seconds
+        return [s for s in self.samples if s['time'] >= cutoff]
+
+    def average(self, key, seconds):
+        """Average of a sample field over the last `seconds`, ignoring missing values."""
+        values = [s[key] for s in self._window(seconds) if s[key] is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    def maximum(self, key, seconds):
+        """Maximum of a sample field over the last `seconds`, ignoring missing values."""
+        values = [s[key] for s in self._window(seconds) if s[key] is not None]
+        return max(values) if values else None
+
+    def availability(self, seconds):
+        """Percentage of probes in the last `seconds` that reached the website."""
+        window = self._window(seconds)
+        if not window or self.probe is None:
+            return None
+        reached = sum(1 for s in window if s['upstream_status'] is not None)
+        return round(reached / len(window) * 100, 1)
+
+    def stats(self):
+        """Return the latest sample with 1 and 5 minute trends as a dictionary."""
+        latest = self.latest() or {}
+        return {
+            'samples': len(self.samples),
+            'age_s': round(time.time() - latest['time'], 1) if latest else None,
+            'cpu': latest.get('cpu'),
+            'cpu_1m': self.average('cpu', 60),
+            'cpu_5m': self.average('cpu', 300),
+            'rss_mb': latest.get('rss_mb'),
+            'rss_mb_5m': self.average('rss_mb', 300),
+            'loop_lag_ms': latest.get('loop_lag_ms'),
+            'loop_lag_ms_5m_max': self.maximum('loop_lag_ms', 300),
+            'upstream_status': latest.get('upstream_status'),
+            'upstream_ms': latest.get('upstream_ms'),
+            'upstream_ms_5m': self.average('upstream_ms', 300),
+            'availability_5m': self.availability(300),
+        }
@@ -3,21 +3,73 @@ RTanks Online Website Scraper
 Handles scraping player data from the RTanks ratings website.
 """
 
-import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-import random
+import codecs
+import time
+from collections import Counter
+import aiohttp
 import re
 import logging
 from urllib.parse import quote
 import json
 
+from cache import SnapshotCache, normalize_username
+from singleflight import SingleFlight
+from extractor import DEFAULT_EXTRACTOR, EQUIPMENT_EXTRACTOR, StreamingExtractor, find_experience_ratio
+from ratelimit import TokenBucket
+from parse_pool import ParsePool
+from store import SnapshotStore
+from history import HistoryStore
+from rankings_index import RankingsIndex
+from http_client import HttpClient
+from breaker import CircuitBreaker, CircuitOpenError
+from metrics import STAGE_SECONDS, CACHE_HITS, CACHE_MISSES, RETRIES, UPSTREAM_RESPONSES, UPSTREAM_ERRORS
+from tracing import span
+from ranks import rank_for_experience, next_threshold_for_experience
+from html_backend import get_backend
+from config import (
+    RTANKS_BASE_URL, RTANKS_TIMEOUT,
+    HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST, HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_WARM_CONNECTIONS, HTTP_KEEP_WARM_INTERVAL,
+    PLAYER_CACHE_TTL, PLAYER_CACHE_MAX_ENTRIES, PLAYER_CACHE_MAX_BYTES,
+    NEGATIVE_CACHE_TTL, NEGATIVE_CACHE_MAX_ENTRIES, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT,
+    REQUEST_RATE, REQUEST_BURST, PARSE_EXECUTOR, PARSE_WORKERS, EXTRACTION_BACKEND,
+    STREAM_PROFILE_FETCH, STREAM_CHUNK_SIZE, MAX_PROFILE_BYTES, PROFILE_ENCODING,
+    VALIDATOR_CACHE_TTL, VALIDATOR_CACHE_MAX_ENTRIES, VALIDATOR_CACHE_MAX_BYTES,
+    SNAPSHOT_STORE_PATH, SNAPSHOT_STORE_FRESHNESS, SNAPSHOT_STORE_MAX_AGE, SNAPSHOT_STORE_MAX_BYTES,
+    HISTORY_PATH, HISTORY_MIN_INTERVAL, HISTORY_FULL_RESOLUTION, HISTORY_HOURLY_FOR, HISTORY_RETENTION,
+    HISTORY_COMPACT_INTERVAL, RANKINGS_REFRESH_INTERVAL, RANKINGS_MAX_AGE, BULK_CONCURRENCY
+)
+
 logger = logging.getLogger(__name__)
 
+# Labelled profile fields read by the combined extractor scan (experience first)
+LABELLED_FIELDS = ('experience', 'kills', 'deaths', 'kd_ratio', 'premium', 'group', 'gold_boxes')
+
+# Reads the online status span and rankings table rows (see html_backend.py)
+HTML_BACKEND = get_backend(EXTRACTION_BACKEND)
+
+NUMERIC_CELL_RE = re.compile(r'[\d\s,.#%+-]*')
+
+GROUP_MAPPING = {
+    'Помощник': 'Helper',
+    'Игрок': 'Player',
+    'Модератор': 'Moderator',
+    'Администратор': 'Administrator'
+}
+
+
+class UpstreamError(Exception):
+    """The website answered with an error or not at all."""
+
+
 class RTanksScraper:
-    def __init__(self):
-        self.base_url = "https://ratings.ranked-rtanks.online"
-        self.session = None
+    def __init__(self, history_path=HISTORY_PATH, processes=1):
+        """
+        processes is the number of bot processes sharing the website's request budget;
+        each gets an equal share of it.
+        """
+        self.base_url = RTANKS_BASE_URL
         
         # Headers to avoid bot detection
         self.headers = {
@@ -33,574 +85,664 @@ class RTanksScraper:
             'Sec-Fetch-Site': 'none',
         }
         
-    async def _get_session(self):
-        """Get or create an aiohttp session."""
-        if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers=self.headers
+        # Recently parsed player snapshots
+        self.cache = SnapshotCache(
+            max_entries=PLAYER_CACHE_MAX_ENTRIES,
+            max_bytes=PLAYER_CACHE_MAX_BYTES,
+            default_ttl=PLAYER_CACHE_TTL
+        )
+        
+        # Parsed results of earlier responses with their ETag/Last-Modified validators, by URL
+        self.validators = SnapshotCache(
+            max_entries=VALIDATOR_CACHE_MAX_ENTRIES,
+            max_bytes=VALIDATOR_CACHE_MAX_BYTES,
+            default_ttl=VALIDATOR_CACHE_TTL
+        )
+        self.status_counts = Counter()
+        
+        # Names that recently resolved to no player
+        self.negative_cache = SnapshotCache(
+            max_entries=NEGATIVE_CACHE_MAX_ENTRIES,
+            default_ttl=NEGATIVE_CACHE_TTL
+        )
+        self.negative_hits = 0
+        
+        # Stops sending requests while the website is failing
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+        self.stale_served = 0
+        
+        # Snapshots that survive restarts
+        self.store = None
+        if SNAPSHOT_STORE_PATH:
+            self.store = SnapshotStore(
+                SNAPSHOT_STORE_PATH,
+                max_bytes=SNAPSHOT_STORE_MAX_BYTES,
+                max_age=SNAPSHOT_STORE_MAX_AGE
             )
-        return self.session
+        
+        # Progress over time of every player fetched, for /history
+        self.history = HistoryStore(
+            history_path,
+            min_interval=HISTORY_MIN_INTERVAL,
+            full_resolution=HISTORY_FULL_RESOLUTION,
+            hourly_for=HISTORY_HOURLY_FOR,
+            retention=HISTORY_RETENTION,
+            compact_interval=HISTORY_COMPACT_INTERVAL
+        )
+        
+        # Lookups currently being fetched, shared by concurrent callers
+        self.inflight = SingleFlight()
+        
+        # Shared limiter for every outbound request to the website
+        self.rate_limiter = TokenBucket(REQUEST_RATE / processes, max(1, REQUEST_BURST // processes))
+        
+        # One tuned connection pool for every outbound request
+        self.http = HttpClient(
+            headers=self.headers,
+            timeout=RTANKS_TIMEOUT,
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            dns_cache_ttl=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            keep_warm_interval=HTTP_KEEP_WARM_INTERVAL,
+            limiter=self.rate_limiter
+        )
+        
+        # HTML is parsed off the event loop
+        self.parse_pool = ParsePool(PARSE_EXECUTOR, PARSE_WORKERS)
+        
+        # Rankings tables, refreshed in the background for fallback lookups
+        self.rankings_index = RankingsIndex(
+            self, RANKINGS_REFRESH_INTERVAL * processes, RANKINGS_MAX_AGE * processes
+        )
+        
+    async def _get_session(self):
+        """Get the shared aiohttp session."""
+        return await self.http.get_session()
+    
+    async def warm_up(self):
+        """Open pooled connections to the website and keep them warm while idle."""
+        await self.http.warm_up(self.base_url, HTTP_WARM_CONNECTIONS)
+        self.http.start_keep_warm(self.base_url)
     
-    async def get_player_data(self, username):
+    async def get_player_data(self, username, fresh=False, fields=None):
         """
         Scrape player data from the RTanks ratings website.
         Returns a dictionary with player information or None if not found.
+        Recently fetched players are served from the snapshot cache unless fresh is set.
+        If fields is given (e.g. ('experience', 'is_online')), only those are guaranteed and
+        the page download stops as soon as they have been seen; such results carry
+        'partial': True and are not cached.
+        """
+        key = normalize_username(username)
+        if not fresh:
+            cached = self.cache.get(username)
+            if cached:
+                logger.info(f"Cache hit for {username}")
+                CACHE_HITS.inc(cache='memory')
+                return cached
+            if key in self.negative_cache:
+                self.negative_hits += 1
+                CACHE_HITS.inc(cache='negative')
+                logger.info(f"Negative cache hit for {username}")
+                return None
+        
+        # A full fetch already in flight covers any subset of fields
+        if fields is not None and key not in self.inflight:
+            fields = tuple(sorted(set(fields)))
+            return await self.inflight.do((key, fields), lambda: self._fetch_guarded(username, fields))
+        
+        # Fresh lookups get their own flight: a normal one may be answered from the store
+        flight = (key, 'fresh') if fresh else key
+        return await self.inflight.do(flight, lambda: self._fetch_and_cache(username, fresh))
+    
+    async def get_players_bulk(self, usernames, fresh=False, fields=None, concurrency=BULK_CONCURRENCY):
+        """
+        Look up several players concurrently and yield (username, player_data) as each completes.
+        Names are deduplicated case-insensitively; at most `concurrency` lookups run at once and
+        all of them share the scraper's rate limiter. player_data is None for players not found.
+        """
+        unique = {}
+        for username in usernames:
+            username = username.strip()
+            if username:
+                unique.setdefault(normalize_username(username), username)
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def lookup(username):
+            async with semaphore:
+                return username, await self.get_player_data(username, fresh=fresh, fields=fields)
+        
+        tasks = [asyncio.ensure_future(lookup(username)) for username in unique.values()]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # The caller stopped early: don't leave lookups running
+            for task in tasks:
+                task.cancel()
+    
+    async def _fetch_and_cache(self, username, fresh=False):
+        """Fetch a player (persistent store first) and store the result in both caches."""
+        if self.store:
+            with span('store_get'):
+                stored = await self.store.get(username)
+            if stored:
+                player_data, meta = stored
+                # Cached in memory only for the time it has left to be served
+                age = time.time() - meta['fetched_at']
+                if not fresh and age < SNAPSHOT_STORE_FRESHNESS:
+                    logger.info(f"Snapshot store hit for {username}")
+                    CACHE_HITS.inc(cache='store')
+                    self.cache.set(username, player_data, ttl=min(PLAYER_CACHE_TTL, SNAPSHOT_STORE_FRESHNESS - age))
+                    return player_data
+                # Too old to serve, but its validators still allow a cheap 304 revalidation
+                if meta['url'] and (meta['etag'] or meta['last_modified']) and meta['url'] not in self.validators:
+                    self._remember_validators(meta['url'], (meta['etag'], meta['last_modified']), player_data)
+        
+        player_data = await self._fetch_guarded(username)
+        if player_data and not player_data.get('stale'):
+            self.negative_cache.invalidate(username)
+            self.cache.set(username, player_data)
+            if self.history:
+                self.history.record(player_data)
+            if self.store:
+                url = self._profile_url(username)
+                validators = self.validators.get(url, count=False) or {}
+                self.store.put(
+                    username, player_data,
+                    url=url,
+                    etag=validators.get('etag'),
+                    last_modified=validators.get('last_modified')
+                )
+        return player_data
+    
+    async def _fetch_guarded(self, username, fields=None):
+        """Fetch a player, or serve the last known snapshot while the circuit is open."""
+        try:
+            return await self._fetch_player_data(username, fields)
+        except CircuitOpenError as e:
+            logger.warning(f"Website unavailable ({e}), serving last known data for {username}")
+            return await self._stale_snapshot(username)
+    
+    async def _stale_snapshot(self, username):
+        """Return the newest data we still hold for a player regardless of age, marked 'stale'."""
+        player_data = None
+        previous = self.validators.get(self._profile_url(username), count=False)
+        if previous:
+            player_data = previous['result']
+        elif self.store:
+            stored = await self.store.get(username)
+            if stored:
+                player_data = stored[0]
+        if player_data is None and self.rankings_index.players:
+            player_data = self.rankings_index.lookup(username)
+        if player_data is not None:
+            self.stale_served += 1
+            player_data['stale'] = True
+        return player_data
+    
+    def _profile_url(self, username):
+        return f"{self.base_url}/user/{quote(username)}"
+    
+    async def _fetch_player_data(self, username, fields=None):
+        """
+        Fetch and parse player data from the website, bypassing the cache.
+        Names confirmed missing are remembered in the negative cache; raises
+        CircuitOpenError when the circuit breaker refuses the request.
         """
+        CACHE_MISSES.inc()
         try:
             session = await self._get_session()
             
-            # Add random delay to avoid rate limiting
-            await asyncio.sleep(random.uniform(0.5, 1.5))
-            
             # Try the correct URL pattern for RTanks
             possible_urls = [
-                f"{self.base_url}/user/{quote(username)}"
+                self._profile_url(username)
             ]
             
             player_data = None
+            # Only a clean "not found" everywhere may be negatively cached
+            definitive = True
             for url in possible_urls:
                 try:
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            html = await response.text()
-                            player_data = await self._parse_player_data(html, username)
-                            if player_data:
-                                break
-                        elif response.status == 404:
-                            continue
+                    await self._acquire_request_slot()
+                    with STAGE_SECONDS.time(stage='fetch'), span('fetch', url=url) as fetch_span:
+                        async with session.get(url, headers=self._conditional_headers(url)) as response:
+                            self._record_status(response.status)
+                            fetch_span.set(status=response.status)
+                            if response.status == 304:
+                                previous = self.validators.get(url)
+                                if previous:
+                                    # Unchanged since the last download: reuse the parsed result
+                                    logger.info(f"Profile not modified: {url}")
+                                    CACHE_HITS.inc(cache='not_modified')
+                                    player_data = previous['result']
+                                    break
+                                definitive = False
+                                continue
+                            elif response.status == 200:
+                                html = await self._read_profile(response, fields)
+                                validators = self._response_validators(response)
+                            elif response.status == 404:
+                                continue
+                            else:
+                                logger.warning(f"Unexpected status code {response.status} for {url}")
+                                definitive = False
+                                continue
+                    
+                    player_data = await self._parse_player_data(html, username)
+                    if player_data:
+                        if fields is not None:
+                            player_data['partial'] = True
                         else:
-                            logger.warning(f"Unexpected status code {response.status} for {url}")
-                            continue
+                            self._remember_validators(url, validators, player_data)
+                        break
                             
+                except CircuitOpenError:
+                    raise
                 except asyncio.TimeoutError:
                     logger.warning(f"Timeout while fetching {url}")
+                    UPSTREAM_ERRORS.inc(kind='timeout')
+                    self.breaker.record_failure()
+                    definitive = False
+                    continue
+                except aiohttp.ClientError as e:
+                    logger.error(f"Error fetching {url}: {e}")
+                    UPSTREAM_ERRORS.inc(kind='connection')
+                    self.breaker.record_failure()
+                    definitive = False
                     continue
                 except Exception as e:
                     logger.error(f"Error fetching {url}: {e}")
+                    definitive = False
                     continue
             
             if not player_data:
                 # Try searching the main page for the player
-                player_data = await self._search_player_on_main_page(username)
+                RETRIES.inc(reason='rankings_fallback')
+                with span('rankings_fallback', indexed=self.rankings_index.is_fresh()):
+                    try:
+                        player_data = await self._search_player_on_main_page(username)
+                    except CircuitOpenError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error searching main page: {e}")
+                        definitive = False
+            
+            if not player_data and definitive and fields is None:
+                self.negative_cache.set(username, True)
             
             return player_data
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Error in get_player_data: {e}")
             return None
     
+    async def _read_profile(self, response, fields=None):
+        """
+        Read a profile page body and return it as text.
+        In streaming mode the body is read in chunks, decoded with the declared charset
+        (no detection pass), and reading stops at MAX_PROFILE_BYTES or, when fields
+        are given, as soon as all of them have been seen.
+        """
+        if not STREAM_PROFILE_FETCH:
+            return await response.text()
+        
+        decoder = codecs.getincrementaldecoder(response.charset or PROFILE_ENCODING)(errors='replace')
+        watcher = StreamingExtractor(fields) if fields is not None else None
+        parts = []
+        received = 0
+        truncated = False
+        
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            received += len(chunk)
+            if received > MAX_PROFILE_BYTES:
+                chunk = chunk[:len(chunk) - (received - MAX_PROFILE_BYTES)]
+                truncated = True
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if truncated:
+                logger.warning(f"Profile page {response.url} exceeded {MAX_PROFILE_BYTES} bytes, truncating")
+                break
+            if watcher and watcher.feed(text):
+                truncated = True
+                logger.debug(f"All requested fields found after {received} bytes of {response.url}")
+                break
+        
+        parts.append(decoder.decode(b'', final=not truncated))
+        if truncated:
+            # Drop the rest of the body instead of draining it
+            response.close()
+        return ''.join(parts)
+    
     async def _parse_player_data(self, html, username):
-        """Parse player data from HTML response."""
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            logger.info(f"Parsing data for {username}")
-            
-            # Initialize player data
-            player_data = {
-                'username': username,
-                'rank': 'Unknown',
-                'experience': 0,
-                'kills': 0,
-                'deaths': 0,
-                'kd_ratio': '0.00',
-                'gold_boxes': 0,
-                'premium': False,
-                'group': 'Unknown',
-                'is_online': False,
-                'status_indicator': '🔴',
-                'equipment': {'turrets': [], 'hulls': []}
-            }
-            
-            # Debug: Log some of the HTML to understand structure
-            logger.info(f"HTML contains 'offline': {'offline' in html.lower()}")
-            logger.info(f"HTML contains 'online': {'online' in html.lower()}")
-            
-            # Parse online status from the small circle near player name
-            # Parse online status from a hidden span with id="online_status"
-            try:
-                status_span = soup.find('span', id='online_status')
-                if status_span:
-                    status_text = status_span.get_text(strip=True).lower()
-                    is_online = status_text == 'yes'
-                    logger.info(f"{username} detected as {'ONLINE' if is_online else 'OFFLINE'} from span")
-                else:
-                    is_online = False
-                    logger.warning("No <span id='online_status'> found")
-            except Exception as e:
-                is_online = False
-                logger.error(f"Error reading online status from span: {e}")
-
-            player_data['is_online'] = is_online
-            player_data['status_indicator'] = '🟢' if is_online else '🔴'
-            logger.info(f"{username} detected as {'ONLINE' if is_online else 'OFFLINE'}")
-            logger.info(f"{username} detected as {'ONLINE' if is_online else 'OFFLINE'}")
-            
-            # Parse experience FIRST - Look for current/max format like "105613/125000"
-            exp_patterns = [
-                r'(\d{1,3}(?:\s?\d{3})*)\s*/\s*(\d{1,3}(?:\s?\d{3})*)',  # Current/max format with spaces
-                r'(\d{1,3}(?:,\d{3})*)\s*/\s*(\d{1,3}(?:,\d{3})*)',     # Current/max format with commas
-                r'(\d+)\s*/\s*(\d+)',                                     # Simple current/max format
-            ]
-            
-            # First try to find current/max experience format
-            exp_found = False
-            for pattern in exp_patterns:
-                exp_match = re.search(pattern, html)
-                if exp_match:
-                    current_exp_str = exp_match.group(1).replace(',', '').replace(' ', '')
-                    max_exp_str = exp_match.group(2).replace(',', '').replace(' ', '')
-                    try:
-                        player_data['experience'] = int(current_exp_str)
-                        player_data['max_experience'] = int(max_exp_str)
-                        exp_found = True
-                        logger.info(f"Found experience: {player_data['experience']}/{player_data['max_experience']}")
-                        break
-                    except ValueError:
-                        continue
-            
-            # If current/max format not found, try single experience value
-            if not exp_found:
-                single_exp_patterns = [
-                    r'Experience[^0-9]*(\d{1,3}(?:,?\d{3})*)',
-                    r'Опыт[^0-9]*(\d{1,3}(?:,?\d{3})*)',
-                    r'"experience"[^0-9]*(\d{1,3}(?:,?\d{3})*)'
-                ]
-                
-                for pattern in single_exp_patterns:
-                    exp_match = re.search(pattern, html, re.IGNORECASE)
-                    if exp_match:
-                        exp_str = exp_match.group(1).replace(',', '').replace(' ', '')
-                        player_data['experience'] = int(exp_str)
-                        logger.info(f"Found single experience: {player_data['experience']}")
-                        break
-            
-            # Parse rank - Enhanced detection with experience-based fallback
-            rank_patterns = [
-                r'(Легенда|Legend)\s*(\d*)',
-                r'(Генералиссимус|Generalissimo)',
-                r'(Командир бригады|Brigadier Commander)',
-                r'(Командир полковник|Colonel Commander)',
-                r'(Командир подполковник|Lieutenant Colonel Commander)',
-                r'(Командир майор|Major Commander)',
-                r'(Командир капитан|Captain Commander)',
-                r'(Командир лейтенант|Lieutenant Commander)',
-                r'(Командир|Commander)',
-                r'(Фельдмаршал|Field Marshal)',
-                r'(Маршал|Marshal)',
-                r'(Генерал|General)',
-                r'(Генерал-лейтенант|Lieutenant General)',
-                r'(Генерал-майор|Major General)',
-                r'(Бригадир|Brigadier)',
-                r'(Полковник|Colonel)',
-                r'(Подполковник|Lieutenant Colonel)',
-                r'(Майор|Major)',
-                r'(Капитан|Captain)',
-                r'(Старший лейтенант|First Lieutenant)',
-                r'(Лейтенант|Second Lieutenant)',
-                r'(Старший прапорщик|Master Warrant Officer)',
-                r'(Прапорщик|Warrant Officer)',
-                r'(Старшина|Sergeant Major)',
-                r'(Старший сержант|First Sergeant)',
-                r'(Сержант|Master Sergeant)',
-                r'(Младший сержант|Staff Sergeant)',
-                r'(Ефрейтор|Sergeant)',
-                r'(Старший ефрейтор|Master Corporal)',
-                r'(Капрал|Corporal)',
-                r'(Гефрейтор|Gefreiter)',
-                r'(Рядовой|Private)',
-                r'(Новобранец|Recruit)'
-            ]
-            
-            rank_found = False
-            for pattern in rank_patterns:
-                rank_match = re.search(pattern, html, re.IGNORECASE)
-                if rank_match:
-                    rank_text = rank_match.group(1)
-                    # Map Russian ranks to English
-                    rank_mapping = {
-                        'Легенда': 'Legend',
-                        'Генералиссимус': 'Generalissimo',
-                        'Командир бригады': 'Brigadier Commander',
-                        'Командир полковник': 'Colonel Commander',
-                        'Командир подполковник': 'Lieutenant Colonel Commander',
-                        'Командир майор': 'Major Commander',
-                        'Командир капитан': 'Captain Commander',
-                        'Командир лейтенант': 'Lieutenant Commander',
-                        'Командир': 'Commander',
-                        'Фельдмаршал': 'Field Marshal',
-                        'Маршал': 'Marshal',
-                        'Генерал': 'General',
-                        'Генерал-лейтенант': 'Lieutenant General',
-                        'Генерал-майор': 'Major General',
-                        'Бригадир': 'Brigadier',
-                        'Полковник': 'Colonel',
-                        'Подполковник': 'Lieutenant Colonel',
-                        'Майор': 'Major',
-                        'Капитан': 'Captain',
-                        'Старший лейтенант': 'First Lieutenant',
-                        'Лейтенант': 'Second Lieutenant',
-                        'Старший прапорщик': 'Master Warrant Officer',
-                        'Прапорщик': 'Warrant Officer',
-                        'Старшина': 'Sergeant Major',
-                        'Старший сержант': 'First Sergeant',
-                        'Сержант': 'Master Sergeant',
-                        'Младший сержант': 'Staff Sergeant',
-                        'Ефрейтор': 'Sergeant',
-                        'Старший ефрейтор': 'Master Corporal',
-                        'Капрал': 'Corporal',
-                        'Гефрейтор': 'Gefreiter',
-                        'Рядовой': 'Private',
-                        'Новобранец': 'Recruit'
-                    }
-                    player_data['rank'] = rank_mapping.get(rank_text, rank_text)
-                    rank_found = True
-                    logger.info(f"Found rank: {player_data['rank']}")
-                    break
-            
-            # Determine rank from experience using correct RTanks values
-            # Always use experience-based calculation as the primary method
-            if player_data.get('experience', 0) >= 0:
-                if player_data['experience'] >= 1600000:
-                    # Legend: 1,600,000 (+200,000 each level)  
-                    legend_level = 1 + ((player_data['experience'] - 1600000) // 200000)
-                    player_data['rank'] = f'Legend {legend_level}'
-                elif player_data['experience'] >= 1400000:
-                    player_data['rank'] = 'Generalissimo'  # 1,400,000
-                elif player_data['experience'] >= 1255000:
-                    player_data['rank'] = 'Commander'  # 1,255,000
-                elif player_data['experience'] >= 1122000:
-                    player_data['rank'] = 'Field Marshal'  # 1,122,000
-                elif player_data['experience'] >= 1000000:
-                    player_data['rank'] = 'Marshal'  # 1,000,000
-                elif player_data['experience'] >= 889000:
-                    player_data['rank'] = 'General'  # 889,000
-                elif player_data['experience'] >= 787000:
-                    player_data['rank'] = 'Lieutenant General'  # 787,000
-                elif player_data['experience'] >= 692000:
-                    player_data['rank'] = 'Major General'  # 692,000
-                elif player_data['experience'] >= 606000:
-                    player_data['rank'] = 'Brigadier'  # 606,000
-                elif player_data['experience'] >= 527000:
-                    player_data['rank'] = 'Colonel'  # 527,000
-                elif player_data['experience'] >= 455000:
-                    player_data['rank'] = 'Lieutenant Colonel'  # 455,000
-                elif player_data['experience'] >= 390000:
-                    player_data['rank'] = 'Major'  # 390,000
-                elif player_data['experience'] >= 332000:
-                    player_data['rank'] = 'Captain'  # 332,000
-                elif player_data['experience'] >= 280000:
-                    player_data['rank'] = 'First Lieutenant'  # 280,000
-                elif player_data['experience'] >= 233000:
-                    player_data['rank'] = 'Second Lieutenant'  # 233,000
-                elif player_data['experience'] >= 192000:
-                    player_data['rank'] = 'Third Lieutenant'  # 192,000
-                elif player_data['experience'] >= 156000:
-                    player_data['rank'] = 'Warrant Officer 5'  # 156,000
-                elif player_data['experience'] >= 125000:
-                    player_data['rank'] = 'Warrant Officer 4'  # 125,000
-                elif player_data['experience'] >= 98000:
-                    player_data['rank'] = 'Warrant Officer 3'  # 98,000
-                elif player_data['experience'] >= 76000:
-                    player_data['rank'] = 'Warrant Officer 2'  # 76,000
-                elif player_data['experience'] >= 57000:
-                    player_data['rank'] = 'Warrant Officer 1'  # 57,000
-                elif player_data['experience'] >= 41000:
-                    player_data['rank'] = 'Sergeant Major'  # 41,000
-                elif player_data['experience'] >= 29000:
-                    player_data['rank'] = 'First Sergeant'  # 29,000
-                elif player_data['experience'] >= 20000:
-                    player_data['rank'] = 'Master Sergeant'  # 20,000
-                elif player_data['experience'] >= 12300:
-                    player_data['rank'] = 'Staff Sergeant'  # 12,300
-                elif player_data['experience'] >= 7100:
-                    player_data['rank'] = 'Sergeant'  # 7,100
-                elif player_data['experience'] >= 3700:
-                    player_data['rank'] = 'Master Corporal'  # 3,700
-                elif player_data['experience'] >= 1500:
-                    player_data['rank'] = 'Corporal'  # 1,500
-                elif player_data['experience'] >= 500:
-                    player_data['rank'] = 'Gefreiter'  # 500
-                elif player_data['experience'] >= 100:
-                    player_data['rank'] = 'Private'  # 100
-                else:
-                    player_data['rank'] = 'Recruit'  # 0-99
-                logger.info(f"Determined rank from experience: {player_data['rank']}")
-                rank_found = True  # Mark as found since we used experience-based calculation
-                
-            # Assign max experience based on rank if not already set
-            from utils import get_max_experience_for_rank
-            if not player_data.get('max_experience') and player_data.get('rank'):
-                player_data['max_experience'] = get_max_experience_for_rank(player_data['rank'])
-                logger.info(f"Assigned max experience for {player_data['rank']}: {player_data['max_experience']}")
-            
-            # Calculate dynamic Legend rank based on experience
-            if player_data.get('rank', '').startswith('Legend') and player_data.get('experience', 0) >= 1600000:
-                # For every 200,000 XP above 1,600,000, add +1 to Legend rank
-                legend_level = 1 + ((player_data['experience'] - 1600000) // 200000)
-                player_data['rank'] = f'Legend {legend_level}'
-            
-            # Parse combat stats from the structured data
-            # Look for numbers in specific patterns that match the screenshots
-            
-            # Find all digit patterns and try to match them logically
-            all_numbers = re.findall(r'\b(\d+)\b', html)
-            logger.info(f"Found numbers in HTML: {all_numbers[:20]}")  # Log first 20 numbers
-            
-            # Parse kills and deaths from Russian website structure
-            # From screenshot: "Уничтожил" (destroyed/kills) and "Падение" (deaths)
-            
-            # Look for kills pattern - "Уничтожил" in combat stats section with comma-separated numbers
-            kills_patterns = [
-                r'Уничтожил[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)',  # Support both space and comma separators
-                r'Destroyed[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)',
-                r'"destroyed"[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'
-            ]
-            
-            for pattern in kills_patterns:
-                kills_match = re.search(pattern, html, re.IGNORECASE)
-                if kills_match:
-                    kills_str = kills_match.group(1).replace(',', '').replace(' ', '')
-                    player_data['kills'] = int(kills_str)
-                    logger.info(f"Found kills: {player_data['kills']} from pattern {pattern}")
-                    break
-            
-            # Look for deaths pattern - "Hit" is the correct field name from the RTanks site
-            deaths_patterns = [
-                r'Hit\s*(\d{1,3}(?:[\s,]\d{3})*)',  # Match "Hit" followed by number (from RTanks site)
-                r'Подбит[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)',  # Russian alternative
-                r'Падение[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)',  # Russian alternative
-                r'"deaths"[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'
-            ]
-            
-            for pattern in deaths_patterns:
-                deaths_match = re.search(pattern, html, re.IGNORECASE)
-                if deaths_match:
-                    deaths_str = deaths_match.group(1).replace(',', '').replace(' ', '')
-                    player_data['deaths'] = int(deaths_str)
-                    logger.info(f"Found deaths: {player_data['deaths']} from pattern {pattern}")
-                    break
-            
-            # Parse K/D ratio - "У/П" from Russian website
-            kd_patterns = [
-                r'У/П[^0-9]*(\d+\.?\d*)',
-                r'U/P[^0-9]*(\d+\.?\d*)',
-                r'"efficiency"[^0-9]*(\d+\.?\d*)',
-                r'По эффективности[^0-9]*#\d+[^0-9]*(\d+\.?\d*)'
-            ]
-            
-            for pattern in kd_patterns:
-                kd_match = re.search(pattern, html, re.IGNORECASE)
-                if kd_match:
-                    player_data['kd_ratio'] = kd_match.group(1)
-                    logger.info(f"Found K/D: {player_data['kd_ratio']} from pattern {pattern}")
-                    break
-            
-            if not player_data['kd_ratio'] or player_data['kd_ratio'] == '0.00':
-                if player_data['deaths'] > 0:
-                    kd = player_data['kills'] / player_data['deaths']
-                    player_data['kd_ratio'] = f"{kd:.2f}"
-            
-            # Parse premium status - look for "Yes" near "Premium"
-            premium_patterns = [
-                r'Premium[^A-Za-z]*Yes',
-                r'Премиум[^А-Яа-я]*Да'
-            ]
-            
-            for pattern in premium_patterns:
-                if re.search(pattern, html, re.IGNORECASE):
-                    player_data['premium'] = True
-                    logger.info(f"Found premium: True")
-                    break
-            
-            # Parse group
-            group_patterns = [
-                r'Group[^A-Za-z]*(\w+)',
-                r'Группа[^А-Яа-я]*([А-Яа-я\w]+)'
-            ]
-            
-            for pattern in group_patterns:
-                group_match = re.search(pattern, html, re.IGNORECASE)
-                if group_match:
-                    group_text = group_match.group(1)
-                    group_mapping = {
-                        'Помощник': 'Helper',
-                        'Игрок': 'Player',
-                        'Модератор': 'Moderator',
-                        'Администратор': 'Administrator'
-                    }
-                    player_data['group'] = group_mapping.get(group_text, group_text)
-                    logger.info(f"Found group: {player_data['group']}")
-                    break
-            
-            # Parse gold boxes - "Поймано золотых ящиков" from Russian website
-            gold_patterns = [
-                r'Поймано золотых ящиков[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)',  # Support space and comma separators
-                r'Caught gold boxes[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)',
-                r'gold boxes[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)',
-                r'золотых ящиков[^0-9]*(\d{1,3}(?:[\s,]\d{3})*)'
-            ]
-            
-            for pattern in gold_patterns:
-                gold_match = re.search(pattern, html, re.IGNORECASE)
-                if gold_match:
-                    gold_str = gold_match.group(1).replace(',', '').replace(' ', '')
-                    player_data['gold_boxes'] = int(gold_str)
-                    logger.info(f"Found gold boxes: {player_data['gold_boxes']} from pattern {pattern}")
-                    break
-            
-            # Parse equipment (looking for "Установленный Да")
-            turret_mapping = {
-                'Смоки': 'Smoky', 'Рельса': 'Rail', 'Рикошет': 'Ricochet', 
-                'Изида': 'Isida', 'Фриз': 'Freeze', 'Огнемет': 'Flamethrower',
-                'Гром': 'Thunder', 'Молот': 'Hammer', 'Вулкан': 'Vulcan',
-                'Твинс': 'Twins', 'Шафт': 'Shaft', 'Страйкер': 'Striker'
-            }
-            
-            hull_mapping = {
-                'Хантер': 'Hunter', 'Мамонт': 'Mammoth', 'Титан': 'Titan',
-                'Васп': 'Wasp', 'Викинг': 'Viking', 'Хорнет': 'Hornet',
-                'Диктатор': 'Dictator'
-            }
-            
-            # Parse equipment from the detailed equipment section
-            # Look for equipment cards showing "Installed: Yes" and extract mod levels
-            
-            # Find all equipment cards in the HTML
-            equipment_cards = re.findall(r'<div[^>]*class="[^"]*equipment[^"]*"[^>]*>.*?</div>', html, re.DOTALL | re.IGNORECASE)
-            
-            for russian_name, english_name in turret_mapping.items():
-                # Look for this turret in the HTML with multiple patterns
-                patterns = [
-                    f'{russian_name}\\s*M(\\d)',  # "Smoky M0", "Rail M1", etc.
-                    f'{russian_name}\\s*М(\\d)',  # Russian М instead of M
-                    f'{english_name}\\s*M(\\d)'   # English names
-                ]
-                
-                found_equipment = False
-                for pattern in patterns:
-                    matches = re.findall(pattern, html, re.IGNORECASE)
-                    for mod_level in matches:
-                        # Check if this equipment is installed
-                        install_pattern = f'{russian_name}.*?Installed.*?Yes|{english_name}.*?Installed.*?Yes|{russian_name}.*?Установленный.*?Да'
-                        if re.search(install_pattern, html, re.DOTALL | re.IGNORECASE):
-                            player_data['equipment']['turrets'].append(f"{english_name} M{mod_level}")
-                            found_equipment = True
-                            logger.info(f"Found turret: {english_name} M{mod_level}")
-                
-                # If no specific mod level found but equipment is installed, default to M0
-                if not found_equipment:
-                    install_pattern = f'{russian_name}.*?Installed.*?Yes|{english_name}.*?Installed.*?Yes|{russian_name}.*?Установленный.*?Да'
-                    if re.search(install_pattern, html, re.DOTALL | re.IGNORECASE):
-                        player_data['equipment']['turrets'].append(f"{english_name} M0")
-                        logger.info(f"Found turret (default M0): {english_name}")
-            
-            for russian_name, english_name in hull_mapping.items():
-                # Look for this hull in the HTML with multiple patterns
-                patterns = [
-                    f'{russian_name}\\s*M(\\d)',  # "Hunter M0", "Mammoth M1", etc.
-                    f'{russian_name}\\s*М(\\d)',  # Russian М instead of M
-                    f'{english_name}\\s*M(\\d)'   # English names
-                ]
-                
-                found_equipment = False
-                for pattern in patterns:
-                    matches = re.findall(pattern, html, re.IGNORECASE)
-                    for mod_level in matches:
-                        # Check if this equipment is installed
-                        install_pattern = f'{russian_name}.*?Installed.*?Yes|{english_name}.*?Installed.*?Yes|{russian_name}.*?Установленный.*?Да'
-                        if re.search(install_pattern, html, re.DOTALL | re.IGNORECASE):
-                            player_data['equipment']['hulls'].append(f"{english_name} M{mod_level}")
-                            found_equipment = True
-                            logger.info(f"Found hull: {english_name} M{mod_level}")
-                
-                # If no specific mod level found but equipment is installed, default to M0
-                if not found_equipment:
-                    install_pattern = f'{russian_name}.*?Installed.*?Yes|{english_name}.*?Installed.*?Yes|{russian_name}.*?Установленный.*?Да'
-                    if re.search(install_pattern, html, re.DOTALL | re.IGNORECASE):
-                        player_data['equipment']['hulls'].append(f"{english_name} M0")
-                        logger.info(f"Found hull (default M0): {english_name}")
-            
-            # If we found meaningful data, return it
-            if (player_data['experience'] > 0 or 
-                player_data['kills'] > 0 or 
-                player_data['rank'] != 'Unknown'):
-                return player_data
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error parsing player data: {e}")
-            return None
+        """Parse player data from HTML response in the parse pool."""
+        with STAGE_SECONDS.time(stage='parse'), span('parse'):
+            return await self.parse_pool.run(parse_player_html, html, username)
     
     async def _search_player_on_main_page(self, username):
-        """Search for player on the main rankings page."""
+        """
+        Search for player on the main rankings page. Raises if the page could not be fetched.
+        Results carry 'source': 'rankings', as their rank and online status are only guesses.
+        """
+        if self.rankings_index.is_fresh():
+            player_data = self.rankings_index.lookup(username)
+        else:
+            rows = await self._get_rankings_rows()
+            player_data = find_player_in_rankings(rows, username)
+        if player_data:
+            player_data['source'] = 'rankings'
+        return player_data
+    
+    async def _get_rankings_rows(self):
+        """Fetch and parse the rankings tables, revalidating a previous copy if possible."""
+        session = await self._get_session()
+        url = self.base_url
+        
+        await self._acquire_request_slot()
         try:
-            session = await self._get_session()
-            
-            async with session.get(self.base_url) as response:
-                if response.status != 200:
-                    return None
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Look for the player in any rankings tables
-                tables = soup.find_all('table')
-                for table in tables:
-                    if hasattr(table, 'find_all'):
-                        rows = table.find_all('tr')
-                        for row in rows:
-                            if username.lower() in row.get_text().lower():
-                                # Try to extract data from this row
-                                return await self._parse_table_row(row, username)
+            with STAGE_SECONDS.time(stage='fetch'), span('fetch', url=url) as fetch_span:
+                async with session.get(url, headers=self._conditional_headers(url)) as response:
+                    self._record_status(response.status)
+                    fetch_span.set(status=response.status)
+                    if response.status == 304:
+                        previous = self.validators.get(url)
+                        if previous:
+                            return previous['result']
+                    if response.status != 200:
+                        raise UpstreamError(f"rankings page returned status {response.status}")
                 
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error searching main page: {e}")
-            return None
+                    html = await response.text()
+                    validators = self._response_validators(response)
+        except asyncio.TimeoutError:
+            UPSTREAM_ERRORS.inc(kind='timeout')
+            self.breaker.record_failure()
+            raise
+        except aiohttp.ClientError:
+            UPSTREAM_ERRORS.inc(kind='connection')
+            self.breaker.record_failure()
+            raise
+        
+        with STAGE_SECONDS.time(stage='parse'), span('parse'):
+            rows = await self.parse_pool.run(parse_rankings_html, html)
+        self._remember_validators(url, validators, rows)
+        return rows
+    
+    def _conditional_headers(self, url):
+        """Build If-None-Match/If-Modified-Since headers from a previous response to url."""
+        previous = self.validators.get(url, count=False)
+        headers = {}
+        if previous:
+            if previous['etag']:
+                headers['If-None-Match'] = previous['etag']
+            if previous['last_modified']:
+                headers['If-Modified-Since'] = previous['last_modified']
+        return headers
+    
+    @staticmethod
+    def _response_validators(response):
+        return response.headers.get('ETag'), response.headers.get('Last-Modified')
+    
+    def _remember_validators(self, url, validators, result):
+        """Keep a parsed result with the validators it was served with."""
+        etag, last_modified = validators
+        if result and (etag or last_modified):
+            self.validators.set(url, {'etag': etag, 'last_modified': last_modified, 'result': result})
+    
+    async def _acquire_request_slot(self):
+        """Check the circuit breaker, then wait for the rate limiter."""
+        self.breaker.check()
+        with span('rate_limit_wait'):
+            waited = await self.rate_limiter.acquire()
+        STAGE_SECONDS.observe(waited, stage='rate_limit_wait')
     
-    async def _parse_table_row(self, row, username):
-        """Parse player data from a table row."""
+    def _record_status(self, status):
+        self.status_counts[status] += 1
+        UPSTREAM_RESPONSES.inc(status=status)
+        # Server errors and throttling count against the website; anything else means it is up
+        if status >= 500 or status == 429:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+    
+    async def close(self):
+        """Close the HTTP client, flush the snapshot store and stop background work."""
+        await self.rankings_index.stop()
+        await self.http.close()
+        if self.store:
+            await self.store.close()
+        if self.history:
+            await self.history.close()
+        self.parse_pool.shutdown()
+
+
+def parse_player_html(html, username):
+    """Parse player data from a profile page. Runs in the parse pool, so it must stay picklable."""
+    try:
+        # Detail logging below costs real work, so it only runs when DEBUG is enabled
+        debug = logger.isEnabledFor(logging.DEBUG)
+        lowered = html.lower()
+        
+        # Initialize player data
+        player_data = {
+            'username': username,
+            'rank': 'Unknown',
+            'experience': 0,
+            'kills': 0,
+            'deaths': 0,
+            'kd_ratio': '0.00',
+            'gold_boxes': 0,
+            'premium': False,
+            'group': 'Unknown',
+            'is_online': False,
+            'status_indicator': '🔴',
+            'equipment': {'turrets': [], 'hulls': []}
+        }
+        
+        # Debug: Log some of the HTML to understand structure
+        if debug:
+            logger.debug(f"HTML contains 'offline': {'offline' in lowered}, 'online': {'online' in lowered}")
+        
+        # Parse online status from the small circle near player name
+        # Parse online status from a hidden span with id="online_status"
         try:
-            cells = row.find_all(['td', 'th'])
-            if len(cells) < 2:
-                return None
-            
-            player_data = {
+            status_text = HTML_BACKEND.online_status(html)
+            if status_text is not None:
+                is_online = status_text.lower() == 'yes'
+            else:
+                is_online = False
+                logger.warning("No <span id='online_status'> found")
+        except Exception as e:
+            is_online = False
+            logger.error(f"Error reading online status from span: {e}")
+
+        player_data['is_online'] = is_online
+        player_data['status_indicator'] = '🟢' if is_online else '🔴'
+        
+        # Parse experience FIRST - Look for current/max format like "105613/125000"
+        exp_found = False
+        exp_ratio = find_experience_ratio(html)
+        if exp_ratio:
+            player_data['experience'], player_data['max_experience'] = exp_ratio
+            exp_found = True
+        
+        # Find every labelled field in one combined scan of the page. Labels of every locale are
+        # tried in priority order: real pages mix them (e.g. "Hit" on Russian pages)
+        wanted_fields = LABELLED_FIELDS if not exp_found else LABELLED_FIELDS[1:]
+        fields = DEFAULT_EXTRACTOR.extract(html, wanted_fields, lowered)
+        
+        # If current/max format not found, try single experience value
+        exp_match = fields.get('experience')
+        if exp_match:
+            exp_str = exp_match.group(1).replace(',', '').replace(' ', '')
+            player_data['experience'] = int(exp_str)
+        
+        # Determine rank and the next rank's threshold from experience
+        player_data['rank'] = rank_for_experience(player_data['experience'])
+        if not player_data.get('max_experience'):
+            player_data['max_experience'] = next_threshold_for_experience(player_data['experience'])
+        
+        # Parse combat stats from the structured data
+        # Look for numbers in specific patterns that match the screenshots
+        
+        # Find all digit patterns and try to match them logically
+        if debug:
+            all_numbers = re.findall(r'\b(\d+)\b', html)
+            logger.debug(f"Found numbers in HTML: {all_numbers[:20]}")  # Log first 20 numbers
+        
+        # Parse kills and deaths from Russian website structure
+        # From screenshot: "Уничтожил" (destroyed/kills) and "Падение" (deaths)
+        kills_match = fields.get('kills')
+        if kills_match:
+            kills_str = kills_match.group(1).replace(',', '').replace(' ', '')
+            player_data['kills'] = int(kills_str)
+        
+        # "Hit" is the correct deaths field name from the RTanks site
+        deaths_match = fields.get('deaths')
+        if deaths_match:
+            deaths_str = deaths_match.group(1).replace(',', '').replace(' ', '')
+            player_data['deaths'] = int(deaths_str)
+        
+        # Parse K/D ratio - "У/П" from Russian website
+        kd_match = fields.get('kd_ratio')
+        if kd_match:
+            player_data['kd_ratio'] = kd_match.group(1)
+        
+        if not player_data['kd_ratio'] or player_data['kd_ratio'] == '0.00':
+            if player_data['deaths'] > 0:
+                kd = player_data['kills'] / player_data['deaths']
+                player_data['kd_ratio'] = f"{kd:.2f}"
+        
+        # Parse premium status - look for "Yes" near "Premium"
+        if 'premium' in fields:
+            player_data['premium'] = True
+        
+        # Parse group
+        group_match = fields.get('group')
+        if group_match:
+            group_text = group_match.group(1)
+            player_data['group'] = GROUP_MAPPING.get(group_text, group_text)
+        
+        # Parse gold boxes - "Поймано золотых ящиков" from Russian website
+        gold_match = fields.get('gold_boxes')
+        if gold_match:
+            gold_str = gold_match.group(1).replace(',', '').replace(' ', '')
+            player_data['gold_boxes'] = int(gold_str)
+        
+        if debug:
+            for field, match in fields.items():
+                logger.debug(f"Found {field}: {match.group(0)!r} from pattern {match.re.pattern}")
+        
+        # Parse equipment cards showing "Installed: Yes" with their mod levels
+        player_data['equipment'] = EQUIPMENT_EXTRACTOR.extract(html, lowered)
+        
+        found = (player_data['experience'] > 0 or
+                 player_data['kills'] > 0 or
+                 player_data['rank'] != 'Unknown')
+        
+        # One structured record per parsed page instead of a line per field
+        if logger.isEnabledFor(logging.INFO):
+            summary = {
                 'username': username,
-                'rank': 'Legend Premium',  # Default assumption for players on rankings
-                'experience': 0,
-                'kills': 0,
-                'deaths': 0,
-                'kd_ratio': '0.00',
-                'gold_boxes': 0,
-                'premium': True,  # Assume premium if on rankings
-                'group': 'Unknown',
-                'is_online': False,
-                'status_indicator': '⚫',
-                'equipment': {'turrets': [], 'hulls': []}
+                'found': found,
+                'bytes': len(html),
+                'rank': player_data['rank'],
+                'experience': player_data['experience'],
+                'kills': player_data['kills'],
+                'deaths': player_data['deaths'],
+                'kd_ratio': player_data['kd_ratio'],
+                'gold_boxes': player_data['gold_boxes'],
+                'premium': player_data['premium'],
+                'group': player_data['group'],
+                'online': player_data['is_online'],
+                'turrets': player_data['equipment']['turrets'],
+                'hulls': player_data['equipment']['hulls'],
+                'fields': sorted(fields) + (['experience_ratio'] if exp_found else []),
             }
-            
-            # Try to extract numeric values from cells
-            for cell in cells:
-                text = cell.get_text().strip()
-                numbers = re.findall(r'\d{1,3}(?:,\d{3})*', text)
-                if numbers:
-                    # Assume the largest number is experience
-                    max_num = max([int(num.replace(',', '')) for num in numbers])
-                    if max_num > player_data['experience']:
-                        player_data['experience'] = max_num
-            
-            return player_data if player_data['experience'] > 0 else None
-            
-        except Exception as e:
-            logger.error(f"Error parsing table row: {e}")
+            logger.info(f"Parsed profile: {json.dumps(summary, ensure_ascii=False)}", extra={'profile': summary})
+        
+        # If we found meaningful data, return it
+        return player_data if found else None
+        
+    except Exception as e:
+        logger.error(f"Error parsing player data: {e}")
+        return None
+
+
+def parse_rankings_html(html):
+    """
+    Parse every row of the rankings tables into plain data (picklable, cacheable).
+    Each row is {'text': lowercased row text, 'cells': [stripped cell texts],
+    'user': player name from a /user/ link in the row, or None}.
+    """
+    try:
+        return HTML_BACKEND.rankings_rows(html)
+    except Exception as e:
+        logger.error(f"Error parsing rankings page: {e}")
+        return []
+
+
+def build_rankings_index(rows):
+    """Map lowercase username -> parsed row data for every player row of the rankings tables."""
+    index = {}
+    for row in rows:
+        name = row['user'] or next(
+            (cell for cell in row['cells'] if cell and not NUMERIC_CELL_RE.fullmatch(cell)), None
+        )
+        if not name:
+            continue
+        player_data = parse_table_row(row['cells'], name)
+        if player_data:
+            # The first (highest placed) row wins, like the on-demand search
+            index.setdefault(name.lower(), player_data)
+    return index
+
+
+def find_player_in_rankings(rows, username):
+    """Find the first rankings row mentioning the player and parse it."""
+    name = username.lower()
+    for row in rows:
+        if name in row['text']:
+            # Try to extract data from this row
+            return parse_table_row(row['cells'], username)
+    return None
+
+
+def parse_table_row(cells, username):
+    """Parse player data from the cell texts of a rankings table row."""
+    try:
+        if len(cells) < 2:
             return None
-    
-    async def close(self):
-        """Close the aiohttp session."""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        
+        player_data = {
+            'username': username,
+            'rank': 'Legend Premium',  # Default assumption for players on rankings
+            'experience': 0,
+            'kills': 0,
+            'deaths': 0,
+            'kd_ratio': '0.00',
+            'gold_boxes': 0,
+            'premium': True,  # Assume premium if on rankings
+            'group': 'Unknown',
+            'is_online': False,
+            'status_indicator': '⚫',
+            'equipment': {'turrets': [], 'hulls': []}
+        }
+        
+        # Try to extract numeric values from cells
+        for text in cells:
+            numbers = re.findall(r'\d{1,3}(?:,\d{3})*', text)
+            if numbers:
+                # Assume the largest number is experience
+                max_num = max([int(num.replace(',', '')) for num in numbers])
+                if max_num > player_data['experience']:
+                    player_data['experience'] = max_num
+        
+        return player_data if player_data['experience'] > 0 else None
+        
+    except Exception as e:
+        logger.error(f"Error parsing table row: {e}")
+        return None
@@ -0,0 +1,155 @@
+"""
+Sharding helpers for the RTanks Discord Bot.
+Splits shards across worker processes, names per-process files and publishes each
+process's statistics to a table in the shared SQLite database for /botstats.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shard_stats (
+    process INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def shard_ranges(shard_count, processes):
+    """Split shard ids 0..shard_count-1 into `processes` contiguous, near-equal ranges."""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        size = base + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def guild_shard(guild_id, shard_count):
+    """Shard a guild's events are delivered to (Discord's sharding formula)."""
+    return (guild_id >> 22) % shard_count
+
+
+def format_shard_ids(shard_ids):
+    """'0-3' for a contiguous range, '0, 2, 5' otherwise."""
+    shard_ids = sorted(shard_ids)
+    if not shard_ids:
+        return '-'
+    if len(shard_ids) > 1 and shard_ids[-1] - shard_ids[0] == len(shard_ids) - 1:
+        return f'{shard_ids[0]}-{shard_ids[-1]}'
+    return ', '.join(str(shard_id) for shard_id in shard_ids)
+
+
+def process_path(path, process_index):
+    """Per-process variant of a file path: history.bin -> history.shard2.bin."""
+    if not path or process_index is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f'{root}.shard{process_index}{ext}'
+
+
+class ShardStatsTable:
+    """Each worker process writes its statistics row on a schedule; any process can read them all."""
+
+    def __init__(self, path, process_index, collect, interval=15):
+        self.path = path
+        self.process_index = process_index
+        # collect() returns this process's statistics as a JSON-serializable dict
+        self.collect = collect
+        self.interval = interval
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='shard-stats')
+        self._conn = None
+        self._task = None
+
+        # Statistics
+        self.publishes = 0
+        self.errors = 0
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    async def _run_sync(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _publish_sync(self, payload):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO shard_stats (process, data, updated_at) VALUES (?, ?, ?)',
+                (self.process_index, payload, time.time())
+            )
+
+    async def publish(self):
+        """Write this process's current statistics row."""
+        try:
+            payload = json.dumps(self.collect(), ensure_ascii=False, default=str)
+            await self._run_sync(self._publish_sync, payload)
+            self.publishes += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error publishing shard statistics: {e}")
+
+    def _read_sync(self, max_age):
+        rows = self._connect().execute(
+            'SELECT process, data, updated_at FROM shard_stats WHERE updated_at >= ? ORDER BY process',
+            (time.time() - max_age,)
+        ).fetchall()
+        return [dict(json.loads(data), process=process, age_s=round(time.time() - updated_at, 1))
+                for process, data, updated_at in rows]
+
+    async def read(self):
+        """Recent rows of every process (rows older than three intervals belong to dead workers)."""
+        try:
+            return await self._run_sync(self._read_sync, 3 * self.interval)
+        except Exception as e:
+            logger.error(f"Error reading shard statistics: {e}")
+            return []
+
+    async def _loop(self):
+        while True:
+            await self.publish()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start publishing in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        """Stop publishing and close the database."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            await self._run_sync(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """Return publisher statistics as a dictionary."""
+        return {
+            'process': self.process_index,
+            'publishes': self.publishes,
+            'errors': self.errors,
+        }
@@ -0,0 +1,53 @@
+"""
+Request coalescing for the RTanks Discord Bot.
+Concurrent callers asking for the same key share one pending task.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """Registry of in-flight tasks keyed by a normalized lookup key."""
+
+    def __init__(self):
+        self._inflight = {}
+
+        # Statistics
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def __contains__(self, key):
+        return key in self._inflight
+
+    async def do(self, key, coro_factory):
+        """
+        Run coro_factory() once for key and share the result with every concurrent caller.
+        A caller that is cancelled does not cancel the shared task for the others.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(coro_factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """Return coalescing statistics as a dictionary."""
+        return {
+            'in_flight': len(self._inflight),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+        }
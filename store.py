@@ -0,0 +1,215 @@
+"""
+Persistent player snapshot store for the RTanks Discord Bot.
+Keeps parsed snapshots and their fetch metadata in SQLite so the cache is warm after a restart.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import sqlite3
+import time
+
+from cache import normalize_username
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    data TEXT NOT NULL,
+    url TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_fetched_at ON snapshots (fetched_at);
+"""
+
+
+class SnapshotStore:
+    """SQLite-backed (WAL mode) snapshot store with batched writes off the event loop."""
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, max_age=7 * 86400,
+                 flush_interval=2.0, batch_size=200, prune_interval=300):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.prune_interval = prune_interval
+
+        # All database work happens on one dedicated thread
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='store')
+        self._conn = None
+        self._pending = {}
+        self._wakeup = None
+        self._writer_task = None
+        self._last_prune = 0.0
+        self._closed = False
+
+        # Statistics
+        self.reads = 0
+        self.read_hits = 0
+        self.writes = 0
+        self.batches = 0
+        self.pruned = 0
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # Reads
+
+    @staticmethod
+    def _decode(row):
+        username, data, url, etag, last_modified, fetched_at = row
+        meta = {
+            'username': username,
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+        }
+        return json.loads(data), meta
+
+    def _get_sync(self, key):
+        row = self._connect().execute(
+            'SELECT username, data, url, etag, last_modified, fetched_at FROM snapshots WHERE key = ?',
+            (key,)
+        ).fetchone()
+        return self._decode(row) if row else None
+
+    async def get(self, username):
+        """Return (snapshot, metadata) for a player or None. Queued writes are visible."""
+        key = normalize_username(username)
+        self.reads += 1
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.read_hits += 1
+            return self._decode(pending[1:7])
+        try:
+            result = await self._run(self._get_sync, key)
+        except Exception as e:
+            logger.error(f"Error reading snapshot store: {e}")
+            return None
+        if result is not None:
+            self.read_hits += 1
+        return result
+
+    # Writes
+
+    def put(self, username, data, url=None, etag=None, last_modified=None, fetched_at=None):
+        """Queue a snapshot for the next batched write."""
+        if self._closed:
+            return
+        key = normalize_username(username)
+        payload = json.dumps(data, ensure_ascii=False)
+        self._pending[key] = (
+            key, username, payload, url, etag, last_modified,
+            fetched_at or time.time(), len(payload.encode('utf-8'))
+        )
+        self._ensure_writer()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_writer(self):
+        if self._writer_task is None or self._writer_task.done():
+            self._wakeup = asyncio.Event()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def _writer(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _write_sync(self, rows, prune):
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO snapshots '
+                '(key, username, data, url, etag, last_modified, fetched_at, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return self._prune_sync() if prune else 0
+
+    async def flush(self):
+        """Write all queued snapshots in one transaction."""
+        if not self._pending:
+            return
+        rows = list(self._pending.values())
+        self._pending = {}
+        prune = time.monotonic() - self._last_prune >= self.prune_interval
+        try:
+            pruned = await self._run(self._write_sync, rows, prune)
+        except Exception as e:
+            logger.error(f"Error writing snapshot store: {e}")
+            return
+        if prune:
+            self._last_prune = time.monotonic()
+            self.pruned += pruned
+        self.writes += len(rows)
+        self.batches += 1
+
+    # Maintenance
+
+    def _prune_sync(self):
+        """Drop snapshots older than max_age, then the oldest ones until under max_bytes."""
+        conn = self._connect()
+        with conn:
+            removed = conn.execute(
+                'DELETE FROM snapshots WHERE fetched_at < ?',
+                (time.time() - self.max_age,)
+            ).rowcount
+            removed += conn.execute(
+                'DELETE FROM snapshots WHERE key IN ('
+                ' SELECT key FROM ('
+                '  SELECT key, SUM(size) OVER (ORDER BY fetched_at DESC, key) AS running FROM snapshots'
+                ' ) WHERE running > ?'
+                ')',
+                (self.max_bytes,)
+            ).rowcount
+        if removed:
+            logger.info(f"Pruned {removed} snapshot(s) from {self.path}")
+        return removed
+
+    async def close(self):
+        """Flush queued writes and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self._last_prune = time.monotonic()
+        await self.flush()
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """Return store statistics as a dictionary."""
+        return {
+            'path': self.path,
+            'pending': len(self._pending),
+            'reads': self.reads,
+            'read_hits': self.read_hits,
+            'writes': self.writes,
+            'batches': self.batches,
+            'pruned': self.pruned,
+        }
@@ -0,0 +1,120 @@
+"""
+Lightweight request tracing for the RTanks Discord Bot.
+A sampled command opens a trace; spans nested inside it (in the same task or in
+tasks it starts) form a tree that is logged as one JSON line when the command is slow.
+Outside a sampled trace, span() returns a shared no-op object.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+
+from config import TRACE_SAMPLE_RATE, TRACE_SLOW_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar('rtanks_span', default=None)
+
+
+class _NoopSpan:
+    """Stand-in returned when nothing is being traced."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed step; children are spans opened while it is the current span."""
+
+    __slots__ = ('name', 'attrs', 'start', 'end', 'children', '_token')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+        self.end = None
+        self.children = []
+        self._token = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if parent is not None:
+            parent.children.append(self)
+        self.start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes (e.g. a status code) to the span."""
+        self.attrs.update(attrs)
+
+    @property
+    def duration(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+    def to_dict(self, origin):
+        node = {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 2),
+            'duration_ms': round(self.duration * 1000, 2),
+        }
+        if self.attrs:
+            node['attrs'] = self.attrs
+        if self.children:
+            node['children'] = [child.to_dict(origin) for child in self.children]
+        return node
+
+
+class Trace(Span):
+    """Root span of a sampled command; logs its span tree when slower than the threshold."""
+
+    __slots__ = ('trace_id', 'slow_threshold')
+
+    def __init__(self, name, attrs, slow_threshold):
+        super().__init__(name, attrs)
+        self.trace_id = os.urandom(8).hex()
+        self.slow_threshold = slow_threshold
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        if self.duration >= self.slow_threshold:
+            record = {'trace_id': self.trace_id, **self.to_dict(self.start)}
+            logger.warning(f"Slow trace: {json.dumps(record, ensure_ascii=False, default=str)}")
+        return False
+
+
+def trace(name, sample_rate=None, slow_threshold=None, **attrs):
+    """Start a trace for one command, subject to sampling. Use as a context manager."""
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return NOOP_SPAN
+    return Trace(name, attrs, TRACE_SLOW_THRESHOLD if slow_threshold is None else slow_threshold)
+
+
+def span(name, **attrs):
+    """Open a child span of the current span; a no-op outside a sampled trace."""
+    if _current_span.get() is None:
+        return NOOP_SPAN
+    return Span(name, attrs)
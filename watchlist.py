@@ -0,0 +1,337 @@
+"""
+Per-guild player watchlists for the RTanks Discord Bot.
+A background poller refreshes watched players within a requests-per-minute budget,
+soonest-due first, and tells every watching guild when a player ranks up or comes online.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import time
+
+from cache import normalize_username
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, saves from several processes may race
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Enough of the profile page for change detection; the download stops once both are seen
+WATCH_FIELDS = ('experience', 'is_online')
+
+
+class WatchEntry:
+    """One watched player, shared by every guild watching them."""
+
+    __slots__ = ('name', 'guilds', 'due', 'rank', 'experience', 'max_experience', 'is_online',
+                 'checked_at', 'failures')
+
+    def __init__(self, name):
+        self.name = name
+        self.guilds = set()
+        self.due = 0.0
+        self.rank = None
+        self.experience = None
+        self.max_experience = None
+        self.is_online = None
+        self.checked_at = None
+        self.failures = 0
+
+    @property
+    def known(self):
+        return self.rank is not None
+
+    @staticmethod
+    def usable(player_data):
+        """
+        Whether a lookup result reflects the player's profile. Stale snapshots and the
+        rankings-page fallback (a guessed rank, never online) must not change an entry.
+        """
+        return bool(player_data) and not player_data.get('stale') and player_data.get('source') != 'rankings'
+
+    def update(self, player_data):
+        self.rank = player_data.get('rank')
+        self.experience = player_data.get('experience')
+        self.max_experience = player_data.get('max_experience')
+        self.is_online = bool(player_data.get('is_online'))
+        self.checked_at = time.time()
+        self.failures = 0
+
+
+class Watchlist:
+    """Guild watchlists plus the budgeted poller that refreshes them."""
+
+    def __init__(self, scraper, notify, path=None, requests_per_minute=20, online_interval=120,
+                 near_rank_interval=300, idle_interval=900, near_rank_fraction=0.05,
+                 max_backoff=3600, max_per_guild=25, guild_filter=None):
+        self.scraper = scraper
+        # async notify(channel_id, entry, events) posts one message to a guild channel
+        self.notify = notify
+        self.path = path
+        self.requests_per_minute = requests_per_minute
+        self.online_interval = online_interval
+        self.near_rank_interval = near_rank_interval
+        self.idle_interval = idle_interval
+        self.near_rank_fraction = near_rank_fraction
+        self.max_backoff = max_backoff
+        self.max_per_guild = max_per_guild
+        # guild_filter(guild_id) is True for guilds this process serves (None = all of them);
+        # other processes' guilds are left alone in the shared file
+        self.guild_filter = guild_filter
+
+        # guild id -> {'channel_id': int, 'players': {key: name}}
+        self.guilds = {}
+        # normalized name -> WatchEntry, coalesced across guilds
+        self.entries = {}
+        self._task = None
+        # One writer thread, so saves reach the file in the order they were made
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='watchlist')
+
+        # Statistics
+        self.polls = 0
+        self.failures = 0
+        self.rank_ups = 0
+        self.came_online = 0
+        self.notifications = 0
+        self.notify_errors = 0
+
+        self._load()
+
+    # Persistence
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading watchlist file {self.path}: {e}")
+            return
+        for guild_id, guild in saved.items():
+            if not self._owns(int(guild_id)):
+                continue
+            for name in guild.get('players', {}).values():
+                self._attach(int(guild_id), guild.get('channel_id'), name)
+        logger.info(f"Loaded watchlists of {len(self.guilds)} guild(s), {len(self.entries)} player(s)")
+
+    def _owns(self, guild_id):
+        return self.guild_filter is None or self.guild_filter(guild_id)
+
+    def _save_sync(self, guilds):
+        with open(f'{self.path}.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Merge with what other processes saved, replacing only the guilds served here
+            saved = {}
+            if self.guild_filter is not None and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        saved = {guild_id: guild for guild_id, guild in json.load(f).items()
+                                 if not self._owns(int(guild_id))}
+                except (OSError, ValueError) as e:
+                    logger.error(f"Error reading watchlist file {self.path}: {e}")
+            saved.update(guilds)
+            temporary = f'{self.path}.tmp{os.getpid()}'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(saved, f, ensure_ascii=False)
+            os.replace(temporary, self.path)
+
+    async def _save(self):
+        if not self.path:
+            return
+        guilds = {
+            str(guild_id): {'channel_id': guild['channel_id'], 'players': dict(guild['players'])}
+            for guild_id, guild in self.guilds.items()
+        }
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._save_sync, guilds)
+        except Exception as e:
+            logger.error(f"Error writing watchlist file {self.path}: {e}")
+
+    # Watchlist changes
+
+    def _attach(self, guild_id, channel_id, name):
+        key = normalize_username(name)
+        guild = self.guilds.setdefault(guild_id, {'channel_id': channel_id, 'players': {}})
+        guild['players'][key] = name
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = WatchEntry(name)
+        entry.guilds.add(guild_id)
+        return entry
+
+    async def add(self, guild_id, channel_id, username, player_data=None):
+        """
+        Watch a player for a guild, sending its notifications to channel_id from now on.
+        Returns 'added', 'exists' or 'full'. player_data, if given, is the baseline
+        later polls are compared with.
+        """
+        guild = self.guilds.get(guild_id)
+        key = normalize_username(username)
+        if guild and key in guild['players']:
+            guild['channel_id'] = channel_id
+            await self._save()
+            return 'exists'
+        if guild and len(guild['players']) >= self.max_per_guild:
+            return 'full'
+        entry = self._attach(guild_id, channel_id, username)
+        self.guilds[guild_id]['channel_id'] = channel_id
+        if not entry.known and WatchEntry.usable(player_data):
+            entry.update(player_data)
+            entry.due = time.monotonic() + self._interval(entry)
+        await self._save()
+        return 'added'
+
+    async def remove(self, guild_id, username):
+        """Stop watching a player for a guild; returns False if it wasn't watched."""
+        guild = self.guilds.get(guild_id)
+        key = normalize_username(username)
+        if not guild or key not in guild['players']:
+            return False
+        del guild['players'][key]
+        if not guild['players']:
+            del self.guilds[guild_id]
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry.guilds.discard(guild_id)
+            if not entry.guilds:
+                del self.entries[key]
+        await self._save()
+        return True
+
+    def watched(self, guild_id):
+        """Entries watched by a guild, in the order they were added."""
+        guild = self.guilds.get(guild_id)
+        if not guild:
+            return []
+        return [self.entries[key] for key in guild['players'] if key in self.entries]
+
+    # Polling
+
+    def _interval(self, entry):
+        """Seconds until the next refresh: online players and near rank-ups come first."""
+        if entry.failures:
+            return min(self.idle_interval * 2 ** (entry.failures - 1), self.max_backoff)
+        if entry.is_online:
+            return self.online_interval
+        if entry.max_experience and entry.experience is not None:
+            remaining = entry.max_experience - entry.experience
+            if 0 <= remaining <= entry.max_experience * self.near_rank_fraction:
+                return self.near_rank_interval
+        return self.idle_interval
+
+    @staticmethod
+    def _changes(entry, player_data):
+        """Events between the last known state of a player and a new snapshot."""
+        if not entry.known:
+            return []
+        events = []
+        rank = player_data.get('rank')
+        experience = player_data.get('experience') or 0
+        if rank and rank not in (entry.rank, 'Unknown') and experience > (entry.experience or 0):
+            events.append({'type': 'rank_up', 'old': entry.rank, 'new': rank})
+        if player_data.get('is_online') and not entry.is_online:
+            events.append({'type': 'online'})
+        return events
+
+    async def poll(self, entry):
+        """Refresh one entry and notify its guilds of any changes."""
+        self.polls += 1
+        try:
+            player_data = await self.scraper.get_player_data(entry.name, fields=WATCH_FIELDS)
+        except Exception as e:
+            logger.error(f"Error polling watched player {entry.name}: {e}")
+            player_data = None
+
+        if not WatchEntry.usable(player_data):
+            self.failures += 1
+            entry.failures += 1
+            entry.due = time.monotonic() + self._interval(entry)
+            return []
+
+        events = self._changes(entry, player_data)
+        entry.update(player_data)
+        entry.due = time.monotonic() + self._interval(entry)
+
+        for event in events:
+            if event['type'] == 'rank_up':
+                self.rank_ups += 1
+            else:
+                self.came_online += 1
+        # The player may have been unwatched while the request was running
+        if events and self.entries.get(normalize_username(entry.name)) is entry:
+            await self._notify(entry, events)
+        return events
+
+    async def _notify(self, entry, events):
+        for guild_id in list(entry.guilds):
+            guild = self.guilds.get(guild_id)
+            if not guild or not guild.get('channel_id'):
+                continue
+            try:
+                await self.notify(guild['channel_id'], entry, events)
+                self.notifications += 1
+            except Exception as e:
+                self.notify_errors += 1
+                logger.error(f"Error notifying guild {guild_id} about {entry.name}: {e}")
+
+    def _next_due(self):
+        return min(self.entries.values(), key=lambda entry: entry.due, default=None)
+
+    async def _run(self):
+        spacing = 60.0 / self.requests_per_minute
+        while True:
+            entry = self._next_due()
+            now = time.monotonic()
+            if entry is None or entry.due > now:
+                # Wake up at least once per slot so newly watched players aren't kept waiting
+                await asyncio.sleep(spacing if entry is None else min(entry.due - now, spacing))
+                continue
+            started = time.monotonic()
+            try:
+                await self.poll(entry)
+            except Exception as e:
+                logger.error(f"Error in watchlist poller: {e}")
+                entry.due = time.monotonic() + self.idle_interval
+            # Never more than requests_per_minute polls, however overdue the list is
+            await asyncio.sleep(max(0.0, spacing - (time.monotonic() - started)))
+
+    def start(self):
+        """Start the background poller."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background poller and let pending saves finish."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """Return watchlist statistics as a dictionary."""
+        now = time.monotonic()
+        slot = 60.0 / self.requests_per_minute
+        return {
+            'guilds': len(self.guilds),
+            'players': len(self.entries),
+            'watches': sum(len(guild['players']) for guild in self.guilds.values()),
+            'online': sum(1 for entry in self.entries.values() if entry.is_online),
+            'overdue': sum(1 for entry in self.entries.values() if entry.due < now - slot),
+            'budget_per_minute': self.requests_per_minute,
+            'polls': self.polls,
+            'failures': self.failures,
+            'rank_ups': self.rank_ups,
+            'came_online': self.came_online,
+            'notifications': self.notifications,
+            'notify_errors': self.notify_errors,
+        }